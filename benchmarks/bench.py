@@ -0,0 +1,390 @@
+'''
+Headless benchmarks for the render loop and the GUI widgets.
+
+Runs the login screen and synthetic screens with N buttons and text boxes under the SDL dummy video driver,
+measuring frames per second, the cost of each phase of a frame and the memory allocated per frame.
+
+Usage (from the project root):
+    python -m benchmarks.bench --output results.json
+    python -m benchmarks.bench --compare baseline.json --tolerance 0.25
+    python -m benchmarks.bench --scenarios= --replay session.log
+'''
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Render without a window; must be set before pygame creates the display.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from scripts.settings import Settings
+from scripts.screen import Screen
+from scripts.localization import Localization
+from scripts.gui import Button, TextBox, text_cache, animator
+from scripts.input import Input
+from scripts.renderer import Renderer
+from scripts.assets import COURIER_PRIME
+from scripts.clock import clock
+from scripts.replay import Player
+
+# Phases of a frame, in order.
+PHASES = ('tick', 'events', 'update', 'draw', 'scale', 'inputs', 'present')
+# Time step of every scenario frame, in seconds. Frames run far faster than real time, so a wall-clock dt
+# would round to 0 ms and nothing would ever move.
+FRAME_DT = 1 / 60
+
+class FakeMouse():
+    '''
+    Scripted mouse, replacing pygame.mouse.get_pos and get_pressed while a scenario runs.
+    '''
+    def __init__(self):
+        self.pos = (0, 0)
+        self.pressed = False
+        self.original = (pygame.mouse.get_pos, pygame.mouse.get_pressed)
+
+    def install(self):
+        pygame.mouse.get_pos = lambda: self.pos
+        pygame.mouse.get_pressed = lambda *args, **kwargs: (self.pressed, False, False)
+
+    def uninstall(self):
+        pygame.mouse.get_pos, pygame.mouse.get_pressed = self.original
+
+class BenchGame():
+    '''
+    Minimal stand-in for Main: the shared objects a canvas needs, with the video settings of the benchmark.
+    Settings changes never reach config/settings.json.
+    '''
+    def __init__(self, width, height, render_mode):
+        pygame.init()
+        self.settings = Settings()
+        # Keep anything the benchmark changes out of the user's settings file.
+        self.settings.file_path = os.path.join(tempfile.mkdtemp(prefix='bench-'), 'settings.json')
+        # Run every frame at the full rate, without waiting for events.
+        self.settings.video.update({'width': width, 'height': height, 'render_mode': render_mode, 'fps': 0, 'idle': False, 'vsync': 0, 'resizable': False})
+        self.screen = Screen(self.settings)
+        self.localization = Localization(self.settings)
+        self.running = True
+
+class SyntheticScreen():
+    '''
+    Canvas with a grid of N buttons and N text boxes, drawn and hit-tested like the login screen.
+    '''
+    def __init__(self, game, count):
+        self.game = game
+        self.screen = game.screen
+        self.surface = self.screen.new_canvas()
+        l = self.screen.layout
+        ratio = self.screen.widget_ratio
+        # Lay the widgets out on a grid covering the reference canvas.
+        columns = max(1, int((count * 2) ** 0.5 * 16 / 9))
+        rows = (count * 2 + columns - 1) // columns
+        cell_w, cell_h = self.screen.WIDTH / columns, self.screen.HEIGHT / rows
+        self.widgets = []
+        for index in range(count * 2):
+            x = (index % columns + 0.5) * cell_w
+            y = (index // columns + 0.5) * cell_h
+            size = l.size(cell_w * 0.9, cell_h * 0.8)
+            font_size = l.length(max(6, min(25, cell_h * 0.4)))
+            if index % 2:
+                self.widgets.append(TextBox(self.surface, ratio, l.pos(x, y), size=size, tb_color=(200, 200, 200), text_font=COURIER_PRIME, text_font_size=font_size, display_text='Username', text_padding=l.length(4)))
+            else:
+                self.widgets.append(Button(self.surface, ratio, l.pos(x, y), size=size, text_font=COURIER_PRIME, text_font_size=font_size, text=f'Button {index//2}'))
+        self.renderer = Renderer(self.surface, (255, 255, 255))
+        for widget in self.widgets:
+            self.renderer.add(widget)
+        self.input = Input(self.screen, self.widgets)
+
+    def events(self):
+        self.input.update()
+        for event in self.screen.get_events():
+            self.screen.event(event)
+            self.input.dispatch(event)
+
+    def update(self):
+        pass
+
+    def inputs(self):
+        for widget in self.widgets:
+            self.input.clicked(widget)
+
+def login_screen(game):
+    '''
+    Creates the login screen.
+    '''
+    # Imported here so the screen's modules are only loaded when the scenario runs.
+    from canvas.login import Login
+    return Login(game)
+
+def fixed_step(screen):
+    '''
+    Starts a frame that advances the screen and its animations by exactly FRAME_DT.
+    '''
+    screen.profiler.begin_frame()
+    screen.dt = FRAME_DT
+    animator.step(FRAME_DT)
+    screen.profiler.mark('tick')
+
+def run_frame(canvas, screen, times):
+    '''
+    Runs one frame of a canvas, phase by phase, adding the time of each phase to times.
+    '''
+    clock = time.perf_counter
+    start = clock()
+    if screen.player is None:
+        fixed_step(screen)
+    else:
+        # Replays advance by the recorded dt.
+        screen.delta_time()
+    t_tick = clock()
+    canvas.events()
+    t_events = clock()
+    canvas.update()
+    t_update = clock()
+    rects = canvas.renderer.render()
+    t_draw = clock()
+    screen.scale_screen(canvas.surface, rects)
+    t_scale = clock()
+    canvas.inputs()
+    t_inputs = clock()
+    screen.screen_update()
+    end = clock()
+    times['tick'].append(t_tick - start)
+    times['events'].append(t_events - t_tick)
+    times['update'].append(t_update - t_events)
+    times['draw'].append(t_draw - t_update)
+    times['scale'].append(t_scale - t_draw)
+    times['inputs'].append(t_inputs - t_scale)
+    times['present'].append(end - t_inputs)
+    times['frame'].append(end - start)
+
+def script_idle(canvas, mouse, frame):
+    '''
+    Nothing happens: measures the cost of an unchanged screen.
+    '''
+
+def script_typing(canvas, mouse, frame):
+    '''
+    Types into the focused text box, clearing it every 40 characters.
+    '''
+    text_box = canvas.sing_in_username_tb if hasattr(canvas, 'sing_in_username_tb') else next(widget for widget in canvas.widgets if isinstance(widget, TextBox))
+    if frame == 0:
+        text_box.pressed = True
+        canvas.input.focused = text_box
+    if len(text_box.text) >= 40:
+        text_box.text = ''
+    char = 'abcdefghijklmnopqrstuvwxyz'[frame % 26]
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=ord(char), unicode=char, mod=0, scancode=0))
+
+def script_slide(canvas, mouse, frame):
+    '''
+    Clicks the visible panel button whenever the panel is at rest, so it keeps sliding from side to side.
+    At FRAME_DT, a slide of Login.PANEL_SLIDE_TIME takes about 21 frames, every one of them redrawing the panel's path.
+    '''
+    button = canvas.panel_sing_up_button if canvas.panel_sing_up_button.visible else canvas.panel_sing_in_button
+    if not canvas.panel.moving and button.visible:
+        ratio = canvas.screen.widget_ratio
+        mouse.pos = (button.button_rect.centerx * ratio[0], button.button_rect.centery * ratio[1])
+        # Press on even frames, release on odd ones.
+        mouse.pressed = frame % 2 == 0
+    else:
+        mouse.pos = (0, 0)
+        mouse.pressed = False
+
+def script_hover(canvas, mouse, frame):
+    '''
+    Sweeps the mouse across the screen, changing the hovered widget every frame.
+    '''
+    width, height = canvas.screen.display_surf.get_size()
+    mouse.pos = ((frame * 37) % width, (frame * 23) % height)
+
+# Scenarios by name, as (canvas factory, input script, animations that must complete during the timed frames).
+SCENARIOS = {
+    'login_idle': (login_screen, script_idle, 0),
+    'login_typing': (login_screen, script_typing, 0),
+    'login_slide': (login_screen, script_slide, 1),
+    'widgets_idle': (SyntheticScreen, script_idle, 0),
+    'widgets_hover': (SyntheticScreen, script_hover, 0),
+    'widgets_typing': (SyntheticScreen, script_typing, 0)
+}
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def summarize(times):
+    '''
+    Returns the fps, the frame time statistics and the mean time of each phase of timed frames.
+    '''
+    return {
+        'fps': len(times['frame']) / sum(times['frame']),
+        'frame_ms': {
+            'mean': statistics.fmean(times['frame']) * 1000,
+            'p50': percentile(times['frame'], 0.5) * 1000,
+            'p99': percentile(times['frame'], 0.99) * 1000,
+            'max': max(times['frame']) * 1000
+        },
+        'phases_ms': {phase: statistics.fmean(times[phase]) * 1000 for phase in PHASES}
+    }
+
+def run_scenario(name, size, frames, alloc_frames, width, height, render_mode):
+    '''
+    Runs a scenario and returns its results.
+
+    Parameters:
+    - name: The scenario name (a key of SCENARIOS);
+    - size: Number of buttons and of text boxes on synthetic screens;
+    - frames: Number of timed frames;
+    - alloc_frames: Number of frames traced for allocations (0 to skip);
+    - width, height: The display size;
+    - render_mode: 'scaled' or 'native'.
+    '''
+    factory, script, min_animations = SCENARIOS[name]
+    game = BenchGame(width, height, render_mode)
+    canvas = factory(game, size) if factory is SyntheticScreen else factory(game)
+    mouse = FakeMouse()
+    mouse.install()
+    try:
+        times = {phase: [] for phase in PHASES + ('frame',)}
+        # Warm up the caches before measuring.
+        for frame in range(10):
+            script(canvas, mouse, frame)
+            run_frame(canvas, game.screen, {phase: [] for phase in PHASES + ('frame',)})
+        completed = animator.completed
+        for frame in range(frames):
+            script(canvas, mouse, frame)
+            run_frame(canvas, game.screen, times)
+        # A scenario meant to animate must not silently measure a still screen.
+        if animator.completed - completed < min_animations:
+            raise RuntimeError(f'{name}: {animator.completed - completed} of {min_animations} animations completed in {frames} frames')
+        result = summarize(times)
+        if alloc_frames:
+            # Memory allocated by Python code while the frames run; traced separately, since tracing slows everything down.
+            tracemalloc.start()
+            start_bytes, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            for frame in range(frames, frames + alloc_frames):
+                script(canvas, mouse, frame)
+                run_frame(canvas, game.screen, {phase: [] for phase in PHASES + ('frame',)})
+            end_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result['alloc'] = {
+                'net_bytes_per_frame': (end_bytes - start_bytes) / alloc_frames,
+                'peak_bytes': peak_bytes - start_bytes
+            }
+        return result
+    finally:
+        mouse.uninstall()
+        animator.clear()
+        # Start every scenario with cold text caches. Pygame itself stays initialized, so the shared fonts remain valid.
+        text_cache.clear()
+
+def run_replay(path):
+    '''
+    Replays an input log recorded with main.py --record on the login screen, timing every frame.
+    The log sets the display size and render mode; the responses of the API are taken from it.
+
+    Parameters:
+    - path: The log file.
+    '''
+    player = Player(path)
+    game = BenchGame(player.size[0], player.size[1], player.render_mode)
+    game.screen.player = player
+    # Recorded times start at 0.
+    clock.freeze(0)
+    try:
+        canvas = login_screen(game)
+        times = {phase: [] for phase in PHASES + ('frame',)}
+        while not player.finished:
+            run_frame(canvas, game.screen, times)
+        return summarize(times)
+    finally:
+        clock.release()
+        text_cache.clear()
+
+def print_result(key, result):
+    alloc = result.get('alloc', {}).get('net_bytes_per_frame')
+    print(f"{key:<22} {result['fps']:>9.0f} fps  mean {result['frame_ms']['mean']:7.3f} ms  p99 {result['frame_ms']['p99']:7.3f} ms  "
+          + '  '.join(f'{phase} {value:.3f}' for phase, value in result['phases_ms'].items())
+          + (f'  alloc {alloc:.0f} B/frame' if alloc is not None else ''))
+
+def compare(results, baseline, tolerance):
+    '''
+    Compares results with a baseline.
+
+    Returns:
+    - A list of (key, baseline value, current value) tuples for every mean frame or phase time that
+      grew by more than the tolerance.
+    '''
+    regressions = []
+    for key, result in results['results'].items():
+        base = baseline.get('results', {}).get(key)
+        if base is None:
+            continue
+        pairs = [('frame_ms.mean', base['frame_ms']['mean'], result['frame_ms']['mean'])]
+        pairs += [(f'phases_ms.{phase}', base['phases_ms'].get(phase, 0), value) for phase, value in result['phases_ms'].items()]
+        for metric, old, new in pairs:
+            # Ignore phases too cheap to measure reliably.
+            if new > old * (1 + tolerance) and new - old > 0.01:
+                regressions.append((f'{key}.{metric}', old, new))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless benchmarks for the render loop and GUI widgets.')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenarios to run.')
+    parser.add_argument('--sizes', default='10,100,500', help='Comma-separated widget counts for the synthetic screens.')
+    parser.add_argument('--frames', type=int, default=300, help='Timed frames per scenario.')
+    parser.add_argument('--alloc-frames', type=int, default=100, help='Frames traced for allocations (0 to skip).')
+    parser.add_argument('--size', default='1280x720', help='Display size, WIDTHxHEIGHT.')
+    parser.add_argument('--render-mode', default='scaled', choices=('scaled', 'native'))
+    parser.add_argument('--replay', action='append', default=[], metavar='LOG', help='Input log recorded with main.py --record to time as a scenario (repeatable).')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--compare', help='Baseline JSON file to compare the results with.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown over the baseline (0.25 = 25%%).')
+    args = parser.parse_args(argv)
+
+    width, height = (int(value) for value in args.size.split('x'))
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'sdl': '.'.join(str(part) for part in pygame.get_sdl_version()),
+            'platform': platform.platform(),
+            'size': [width, height],
+            'render_mode': args.render_mode,
+            'frames': args.frames
+        },
+        'results': {}
+    }
+    for name in filter(None, args.scenarios.split(',')):
+        sizes = [int(size) for size in args.sizes.split(',')] if SCENARIOS[name][0] is SyntheticScreen else [0]
+        for size in sizes:
+            key = f'{name}[{size}]' if size else name
+            results['results'][key] = run_scenario(name, size, args.frames, args.alloc_frames, width, height, args.render_mode)
+            print_result(key, results['results'][key])
+    for path in args.replay:
+        key = f'replay:{os.path.basename(path)}'
+        results['results'][key] = run_replay(path)
+        print_result(key, results['results'][key])
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for key, old, new in regressions:
+            print(f'REGRESSION {key}: {old:.3f} ms -> {new:.3f} ms')
+        if regressions:
+            return 1
+        print('No regressions.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
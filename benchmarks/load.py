@@ -0,0 +1,339 @@
+'''
+Load generator for the authentication API.
+
+Runs N simulated clients that sign up and sign in like the login screen does: forms are checked with the
+game's validation before anything is sent, and requests go through the game's Transport (timeouts,
+retries with backoff, keep-alive). Clients are spread over worker processes, each running its clients on threads.
+
+Usage (from the project root, with the reference server running: python -m server.app --hash-iterations 1000):
+    python -m benchmarks.load --clients 200 --duration 20 --ramp linear --ramp-time 5
+    python -m benchmarks.load --clients 2000 --processes 8 --mix sing_up=1,sing_in=9 --output load.json
+
+The endpoints default to API_NEW_USER and API_SING_IN from the environment (.env).
+'''
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from array import array
+
+# The client code imports pygame; keep its banner out of every worker's output.
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import requests
+from scripts import dotenv
+from scripts.auth import sing_in_body, sing_up_body
+from scripts.transport import Transport
+from scripts.validation import check_sing_in, check_sing_up
+
+# Actions a client can take, named like the login screen's.
+ACTIONS = ('sing_up', 'sing_in')
+
+def start_delay(index, clients, profile, ramp_time, steps):
+    '''
+    Returns how many seconds after the start a client begins.
+
+    Parameters:
+    - index: The client number, from 0 to clients - 1;
+    - clients: The number of clients;
+    - profile: 'burst' (all at once), 'linear' (evenly over ramp_time) or 'step' (in equal groups over ramp_time);
+    - ramp_time: Seconds until the last client starts;
+    - steps: Number of groups of the 'step' profile.
+    '''
+    if profile == 'burst' or clients <= 1:
+        return 0.0
+    if profile == 'linear':
+        return ramp_time * index / (clients - 1)
+    group = index * steps // clients
+    return ramp_time * group / max(1, steps - 1)
+
+def outcome(action, status_code, data):
+    '''
+    Returns a label for the result of a request, e.g. 'sing_up 201 msg_code01' or 'sing_in 200 id'.
+    '''
+    if status_code is None:
+        return f'{action} no response'
+    for key in ('error_code', 'msg_code'):
+        if key in data:
+            return f'{action} {status_code} {key}{data[key]}'
+    if 'id' in data:
+        return f'{action} {status_code} id'
+    return f'{action} {status_code}'
+
+class Results():
+    '''
+    Results of the clients of one worker process, shared by its client threads.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Number of requests (or forms rejected before sending) by outcome label.
+        self.outcomes = {}
+        # Latency in seconds of every request, by action.
+        self.latencies = {action: array('d') for action in ACTIONS}
+        # Completed requests per whole second since the start.
+        self.timeline = {}
+
+    def add(self, label, action=None, seconds=None, second=None):
+        '''
+        Records a result.
+
+        Parameters:
+        - label: The outcome label;
+        - action: The action, for requests that were sent. Default is None;
+        - seconds: The latency of the request. Default is None;
+        - second: Whole second since the start in which the request completed. Default is None.
+        '''
+        with self.lock:
+            self.outcomes[label] = self.outcomes.get(label, 0) + 1
+            if action is not None:
+                self.latencies[action].append(seconds)
+                self.timeline[second] = self.timeline.get(second, 0) + 1
+
+class Client():
+    '''
+    One simulated player: fills in the sign-up and sign-in forms and submits them until the test ends.
+    '''
+    def __init__(self, index, config, results, transport):
+        '''
+        Initializes the Client.
+
+        Parameters:
+        - index: The client number;
+        - config: The test configuration (see run_worker);
+        - results: The Results of the worker;
+        - transport: The Transport this client sends its requests through.
+        '''
+        self.index = index
+        self.config = config
+        self.results = results
+        self.transport = transport
+        self.random = random.Random(f"{config['run']}-{index}")
+        # Accounts this client created, as (username, password) tuples.
+        self.accounts = []
+        self.created = 0
+
+    def run(self):
+        '''
+        Waits for the client's start time, then submits forms until the end of the test.
+        '''
+        config = self.config
+        start = config['start'] + start_delay(self.index, config['clients'], config['ramp'], config['ramp_time'], config['steps'])
+        time.sleep(max(0.0, start - time.time()))
+        end = config['start'] + config['duration']
+        actions, weights = zip(*config['mix'].items())
+        while time.time() < end:
+            action = self.random.choices(actions, weights)[0]
+            # Signing in needs an account.
+            if action == 'sing_in' and not self.accounts:
+                action = 'sing_up'
+            if action == 'sing_up':
+                self.sing_up()
+            else:
+                self.sing_in()
+            if config['think']:
+                time.sleep(self.random.uniform(0, 2 * config['think']))
+
+    def sing_up(self):
+        '''
+        Fills in the sign-up form with a new username (or, sometimes, an invalid form) and submits it.
+        '''
+        self.created += 1
+        username = f"load{self.config['run']}c{self.index}n{self.created}"
+        password = f'pw{self.random.getrandbits(32):x}'
+        confirm_password = password
+        if self.random.random() < self.config['invalid']:
+            # A form the game refuses to send: a mismatched confirmation or a username starting with a digit.
+            if self.random.random() < 0.5:
+                confirm_password = password + 'x'
+            else:
+                username = '1' + username
+        if self.submit('sing_up', check_sing_up(username, password, confirm_password), self.config['sing_up_url'], sing_up_body(username, password, confirm_password)) == 201:
+            self.accounts.append((username, password))
+
+    def sing_in(self):
+        '''
+        Fills in the sign-in form with one of the client's accounts (or, sometimes, a wrong password) and submits it.
+        '''
+        username, password = self.random.choice(self.accounts)
+        if self.random.random() < self.config['wrong_password']:
+            password += 'x'
+        self.submit('sing_in', check_sing_in(username, password), self.config['sing_in_url'], sing_in_body(username, password))
+
+    def submit(self, action, error, url, body):
+        '''
+        Sends a form unless the validation rejected it, and records the result.
+
+        Parameters:
+        - action: 'sing_up' or 'sing_in';
+        - error: The validation error key, or None;
+        - url: The endpoint;
+        - body: The request body.
+
+        Returns:
+        - The status code of the response, or None if nothing was received or sent.
+        '''
+        if error:
+            self.results.add(f'{action} rejected by client {error}')
+            return None
+        status_code = None
+        data = {}
+        start = time.perf_counter()
+        try:
+            response = self.transport.post(url, json=body)
+            status_code = response.status_code
+            data = response.json()
+        except (requests.RequestException, ValueError):
+            pass
+        seconds = time.perf_counter() - start
+        if not isinstance(data, dict):
+            data = {}
+        self.results.add(outcome(action, status_code, data), action, seconds, int(time.time() - self.config['start']))
+        return status_code
+
+def run_worker(config, indexes):
+    '''
+    Runs some of the clients on threads of the current process and returns their results.
+
+    Parameters:
+    - config: Dictionary with run (token making usernames unique), start (epoch time), duration, clients,
+      ramp, ramp_time, steps, mix, think, invalid, wrong_password, retries, timeout, sing_up_url and sing_in_url;
+    - indexes: The numbers of the clients to run.
+
+    Returns:
+    - A dictionary with outcomes, latencies (bytes of array('d') by action) and timeline.
+    '''
+    results = Results()
+    threads = []
+    for index in indexes:
+        # One transport per client, so every client keeps its own connection, like a real player.
+        transport = Transport(timeout=(config['timeout'], config['timeout']), retries=config['retries'], pool_size=1, history=1)
+        client = Client(index, config, results, transport)
+        thread = threading.Thread(target=client.run, name=f'client-{index}', daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return {
+        'outcomes': results.outcomes,
+        'latencies': {action: samples.tobytes() for action, samples in results.latencies.items()},
+        'timeline': results.timeline
+    }
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0.0
+
+def report(config, parts, elapsed):
+    '''
+    Merges the results of the workers.
+
+    Returns:
+    - A dictionary with the request count, throughput, outcome counts, latency percentiles by action (ms)
+      and completed requests per second.
+    '''
+    outcomes = {}
+    timeline = {}
+    latencies = {action: array('d') for action in ACTIONS}
+    for part in parts:
+        for label, count in part['outcomes'].items():
+            outcomes[label] = outcomes.get(label, 0) + count
+        for second, count in part['timeline'].items():
+            timeline[second] = timeline.get(second, 0) + count
+        for action, data in part['latencies'].items():
+            latencies[action].frombytes(data)
+    requests_sent = sum(len(samples) for samples in latencies.values())
+    latency = {}
+    for action, samples in latencies.items():
+        ordered = sorted(samples)
+        latency[action] = {
+            'count': len(ordered),
+            'mean': sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+            'p50': percentile(ordered, 0.5) * 1000,
+            'p90': percentile(ordered, 0.9) * 1000,
+            'p99': percentile(ordered, 0.99) * 1000,
+            'max': (ordered[-1] if ordered else 0.0) * 1000
+        }
+    return {
+        'config': {key: value for key, value in config.items() if key not in ('run', 'start')},
+        'requests': requests_sent,
+        'seconds': elapsed,
+        'throughput': requests_sent / elapsed if elapsed else 0.0,
+        'outcomes': dict(sorted(outcomes.items())),
+        'latency_ms': latency,
+        'per_second': [timeline.get(second, 0) for second in range(max(timeline, default=-1) + 1)]
+    }
+
+def parse_mix(text):
+    '''
+    Parses a mix such as 'sing_up=1,sing_in=4' into a dictionary of weights.
+    '''
+    mix = {}
+    for part in text.split(','):
+        action, _, weight = part.partition('=')
+        if action not in ACTIONS:
+            raise argparse.ArgumentTypeError(f'unknown action {action!r} (expected {", ".join(ACTIONS)})')
+        mix[action] = float(weight or 1)
+    return mix
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load generator for the authentication API.')
+    parser.add_argument('--clients', type=int, default=100, help='Number of simulated clients.')
+    parser.add_argument('--processes', type=int, default=min(4, os.cpu_count() or 1), help='Worker processes the clients are spread over.')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds from the start until the clients stop.')
+    parser.add_argument('--ramp', default='linear', choices=('burst', 'linear', 'step'), help='How the clients start.')
+    parser.add_argument('--ramp-time', type=float, default=2, help='Seconds until the last client starts.')
+    parser.add_argument('--steps', type=int, default=4, help="Groups of clients of the 'step' ramp.")
+    parser.add_argument('--mix', type=parse_mix, default='sing_up=1,sing_in=4', help='Weights of the actions, e.g. sing_up=1,sing_in=4.')
+    parser.add_argument('--think', type=float, default=0, help='Mean seconds a client waits between forms.')
+    parser.add_argument('--invalid', type=float, default=0.02, help='Share of sign-up forms the client-side validation rejects.')
+    parser.add_argument('--wrong-password', type=float, default=0.05, help='Share of sign-ins with a wrong password.')
+    parser.add_argument('--retries', type=int, default=3, help='Retries of transient failures, as in the game.')
+    parser.add_argument('--timeout', type=float, default=10, help='Connect and read timeout in seconds.')
+    parser.add_argument('--sing-up-url', default=dotenv.API_NEW_USER, help='Sign-up endpoint. Default is API_NEW_USER.')
+    parser.add_argument('--sing-in-url', default=dotenv.API_SING_IN, help='Sign-in endpoint. Default is API_SING_IN.')
+    parser.add_argument('--output', help='Write the report as JSON to this file.')
+    args = parser.parse_args(argv)
+    if not args.sing_up_url or not args.sing_in_url:
+        parser.error('set API_NEW_USER and API_SING_IN or pass --sing-up-url and --sing-in-url')
+
+    processes = max(1, min(args.processes, args.clients))
+    config = {
+        'run': uuid.uuid4().hex[:8],
+        # Give every worker time to start its threads before the first client begins.
+        'start': time.time() + 1 + 0.001 * args.clients,
+        'duration': args.duration,
+        'clients': args.clients,
+        'ramp': args.ramp,
+        'ramp_time': args.ramp_time,
+        'steps': args.steps,
+        'mix': args.mix,
+        'think': args.think,
+        'invalid': args.invalid,
+        'wrong_password': args.wrong_password,
+        'retries': args.retries,
+        'timeout': args.timeout,
+        'sing_up_url': args.sing_up_url,
+        'sing_in_url': args.sing_in_url
+    }
+    print(f"{args.clients} clients on {processes} processes, {args.ramp} ramp over {args.ramp_time:g} s, {args.duration:g} s")
+    with multiprocessing.Pool(processes) as pool:
+        parts = pool.starmap(run_worker, [(config, range(worker, args.clients, processes)) for worker in range(processes)])
+    elapsed = max(0.0, min(time.time(), config['start'] + args.duration + args.timeout) - config['start'])
+    result = report(config, parts, elapsed)
+
+    print(f"{result['requests']} requests in {result['seconds']:.1f} s: {result['throughput']:.1f} req/s")
+    for action, stats in result['latency_ms'].items():
+        print(f"{action:<8} {stats['count']:>8} requests  p50 {stats['p50']:8.2f} ms  p90 {stats['p90']:8.2f} ms  p99 {stats['p99']:8.2f} ms  max {stats['max']:8.2f} ms")
+    for label, count in result['outcomes'].items():
+        print(f'  {label:<40} {count:>8}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, indent=4)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
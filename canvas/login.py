@@ -1,13 +1,37 @@
 import pygame
-import requests
-from scripts.gui import Label, Button, TextBox, Panel
+from scripts.gui import Label, Button, TextBox, Panel, animator
 from scripts.assets import COURIER_PRIME, COURIER_PRIME_BOLD
-from scripts.dotenv import *
+from scripts.auth import AuthClient, OfflineAuthClient, AUTH_RESPONSE
+from scripts.validation import check_sing_in, check_sing_up
+from scripts.renderer import Renderer
+from scripts.input import Input
 
 class Login():
     '''
     Handles the game menu, including buttons, sliders, and user interactions.
     '''
+    # Fonts used by the screen, as (path, size) tuples, so they can be preloaded.
+    FONTS = ((COURIER_PRIME, 25), (COURIER_PRIME_BOLD, 25), (COURIER_PRIME_BOLD, 50))
+    # Texts shown by the widgets, as (widget attribute name, widget field, catalog key) tuples.
+    TEXTS = (
+        ('title', 'text', 'title'),
+        ('create_account_title', 'text', 'create_account'),
+        ('sing_in_button', 'text', 'btn_sing_in'),
+        ('sing_up_button', 'text', 'btn_sing_up'),
+        ('panel_sing_in_button', 'text', 'btn_sing_in'),
+        ('panel_sing_up_button', 'text', 'btn_sing_up'),
+        ('forgot_password_button', 'text', 'forgot_password'),
+        ('sing_in_username_tb', 'display_text', 'username'),
+        ('sing_up_username_tb', 'display_text', 'username'),
+        ('sing_in_password_tb', 'display_text', 'password'),
+        ('sing_up_password_tb', 'display_text', 'password'),
+        ('sing_up_confirm_password_tb', 'display_text', 'confirm_password')
+    )
+    # Duration of the panel slide, in seconds.
+    PANEL_SLIDE_TIME = 0.35
+    # Widget attribute names, in drawing order.
+    WIDGETS = ('title', 'create_account_title', 'sing_in_username_tb', 'sing_up_username_tb', 'sing_in_password_tb', 'sing_up_password_tb', 'sing_up_confirm_password_tb', 'forgot_password_button', 'sing_in_button', 'sing_up_button', 'msg_text_text', 'panel', 'panel_sing_up_button', 'panel_sing_in_button')
+
     def __init__(self, game):
         '''
         Initializes the menu, creating a new screen and menu elements.
@@ -18,185 +42,301 @@ class Login():
         self.settings = game.settings
         # Access the game's screen.
         self.screen = game.screen
+        # Client that talks to the API without blocking the frame loop. Replays use the recorded responses instead.
+        self.auth = AuthClient() if self.screen.player is None else OfflineAuthClient()
+        # Per-frame input snapshot, routing mouse and keyboard input to the widgets concerned.
+        self.input = Input(self.screen)
+        # Texts of the active language.
+        self.localization = game.localization
+        # Show the texts of the new language when it changes.
+        self.localization.subscribe(self.language_changed)
         # Setup a new menu screen.
         self.new_screen()
     
     def new_screen(self):
         '''
         Creates a new surface for the menu and initializes menu components.
+        Positions and sizes are given in logical units and converted to canvas pixels by the screen's layout.
         '''
-        # Create a menu surface with the same size as the game screen.
-        self.surface = pygame.Surface((self.screen.WIDTH, self.screen.HEIGHT))
+        # Create the menu surface: the display itself in native mode, otherwise a reference-sized surface.
+        self.surface = self.screen.new_canvas()
+        # Layout converting logical units to canvas pixels.
+        self.layout = l = self.screen.layout
+        # Ratio used by the widgets to map the mouse position to the canvas.
+        ratio = self.screen.widget_ratio
+        W, H = self.screen.WIDTH, self.screen.HEIGHT
 
         # Create text and button elements for the menu.
-        self.title = Label(self.surface, font_size=50, font=COURIER_PRIME_BOLD)
-        self.msg_text_text = Label(self.surface, font_size=25, font=COURIER_PRIME)
-        self.sing_in_button = Button(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH/4, (self.screen.HEIGHT - self.screen.HEIGHT/4)), size=(280, 70), text_font_size=25, text_font=COURIER_PRIME_BOLD, border_radius=30, text_color=(255,255,255), text_hover_color=(255,255,255))
-        self.sing_up_button = Button(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH - self.screen.WIDTH/4, (self.screen.HEIGHT - self.screen.HEIGHT/5)), size=(280, 70), text_font_size=25, text_font=COURIER_PRIME_BOLD, border_radius=30, text_color=(255,255,255), text_hover_color=(255,255,255), visible=False)
-        self.sing_in_username_tb = TextBox(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH/4,  self.screen.HEIGHT/2.8), size=(460, 70), tb_color=(200, 200, 200), text_font_size=25, display_text_color=(120,120,120), text_font=COURIER_PRIME, display_text=self.settings.game_texts['username'])
-        self.sing_up_username_tb = TextBox(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH - self.screen.WIDTH/4,  self.screen.HEIGHT/2.5), size=(460, 70), tb_color=(200, 200, 200), text_font_size=25, display_text_color=(120,120,120), text_font=COURIER_PRIME, display_text=self.settings.game_texts['username'], visible=False)
-        self.sing_in_password_tb = TextBox(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH/4, self.screen.HEIGHT/2), size=(460, 70), tb_color=(200, 200, 200), text_font_size=25, display_text_color=(120,120,120), password=True, text_font=COURIER_PRIME, display_text=self.settings.game_texts['password'])
-        self.sing_up_password_tb = TextBox(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH - self.screen.WIDTH/4, self.screen.HEIGHT - self.screen.HEIGHT/2.2), size=(460, 70), tb_color=(200, 200, 200), text_font_size=25, display_text_color=(120,120,120), password=True, text_font=COURIER_PRIME, display_text=self.settings.game_texts['password'], visible=False)
-        self.sing_up_confirm_password_tb = TextBox(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH - self.screen.WIDTH/4, self.screen.HEIGHT - self.screen.HEIGHT/3.2), size=(460, 70), tb_color=(200, 200, 200), text_font_size=25, display_text_color=(120,120,120), password=True, text_font=COURIER_PRIME, display_text=self.settings.game_texts['confirm_password'], visible=False)
-        self.forgot_password_button = Button(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH/4, (self.screen.HEIGHT - self.screen.HEIGHT/2.8)), size=(300, 75), text_font_size=25, text_font=COURIER_PRIME, transparency=-1, text_color=(100,100,100))
-        self.panel = Panel(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH/2,0), size=(self.screen.WIDTH/2,self.screen.HEIGHT))
-        self.panel_sing_up_button = Button(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH - self.screen.WIDTH/4, (self.screen.HEIGHT - self.screen.HEIGHT/3)), size=(280, 70), text_font_size=25, text_font=COURIER_PRIME_BOLD, border_radius=30, text_color=(255,255,255), text_hover_color=(255,255,255), transparency=-1, border=2, border_color=(255,255,255))
-        self.panel_sing_in_button = Button(self.surface, self.screen.aspect_ratio, (self.screen.WIDTH/4, (self.screen.HEIGHT - self.screen.HEIGHT/3)), size=(280, 70), text_font_size=25, text_font=COURIER_PRIME_BOLD, border_radius=30, text_color=(255,255,255), text_hover_color=(255,255,255), transparency=-1, border=2, border_color=(255,255,255), visible=False)
+        self.title = Label(self.surface, font_size=l.length(50), font=COURIER_PRIME_BOLD, pos=l.pos(int(W/4), int(H/4)), center_w=True, center_h=True)
+        self.create_account_title = Label(self.surface, font_size=l.length(50), font=COURIER_PRIME_BOLD, pos=l.pos(int(W - W/4), int(H/4)), center_w=True, center_h=True)
+        # The message may show data sent by the API (e.g. the user id), which must never reach the disk cache.
+        self.msg_text_text = Label(self.surface, font_size=l.length(25), font=COURIER_PRIME, center_w=True, static=False)
+        self.sing_in_button = Button(self.surface, ratio, l.pos(W/4, (H - H/4)), size=l.size(280, 70), text_font_size=l.length(25), text_font=COURIER_PRIME_BOLD, border_radius=l.length(30), text_color=(255,255,255), text_hover_color=(255,255,255))
+        self.sing_up_button = Button(self.surface, ratio, l.pos(W - W/4, (H - H/5)), size=l.size(280, 70), text_font_size=l.length(25), text_font=COURIER_PRIME_BOLD, border_radius=l.length(30), text_color=(255,255,255), text_hover_color=(255,255,255), visible=False)
+        self.sing_in_username_tb = TextBox(self.surface, ratio, l.pos(W/4, H/2.8), size=l.size(460, 70), tb_color=(200, 200, 200), text_font_size=l.length(25), display_text_color=(120,120,120), text_font=COURIER_PRIME, text_padding=l.length(10))
+        self.sing_up_username_tb = TextBox(self.surface, ratio, l.pos(W - W/4, H/2.5), size=l.size(460, 70), tb_color=(200, 200, 200), text_font_size=l.length(25), display_text_color=(120,120,120), text_font=COURIER_PRIME, visible=False, text_padding=l.length(10))
+        self.sing_in_password_tb = TextBox(self.surface, ratio, l.pos(W/4, H/2), size=l.size(460, 70), tb_color=(200, 200, 200), text_font_size=l.length(25), display_text_color=(120,120,120), password=True, text_font=COURIER_PRIME, text_padding=l.length(10))
+        self.sing_up_password_tb = TextBox(self.surface, ratio, l.pos(W - W/4, H - H/2.2), size=l.size(460, 70), tb_color=(200, 200, 200), text_font_size=l.length(25), display_text_color=(120,120,120), password=True, text_font=COURIER_PRIME, visible=False, text_padding=l.length(10))
+        self.sing_up_confirm_password_tb = TextBox(self.surface, ratio, l.pos(W - W/4, H - H/3.2), size=l.size(460, 70), tb_color=(200, 200, 200), text_font_size=l.length(25), display_text_color=(120,120,120), password=True, text_font=COURIER_PRIME, visible=False, text_padding=l.length(10))
+        self.forgot_password_button = Button(self.surface, ratio, l.pos(W/4, (H - H/2.8)), size=l.size(300, 75), text_font_size=l.length(25), text_font=COURIER_PRIME, transparency=-1, text_color=(100,100,100))
+        self.panel = Panel(self.surface, ratio, l.pos(W/2, 0), size=l.size(W/2, H))
+        self.panel_sing_up_button = Button(self.surface, ratio, l.pos(W - W/4, (H - H/3)), size=l.size(280, 70), text_font_size=l.length(25), text_font=COURIER_PRIME_BOLD, border_radius=l.length(30), text_color=(255,255,255), text_hover_color=(255,255,255), transparency=-1, border=l.length(2), border_color=(255,255,255))
+        self.panel_sing_in_button = Button(self.surface, ratio, l.pos(W/4, (H - H/3)), size=l.size(280, 70), text_font_size=l.length(25), text_font=COURIER_PRIME_BOLD, border_radius=l.length(30), text_color=(255,255,255), text_hover_color=(255,255,255), transparency=-1, border=l.length(2), border_color=(255,255,255), visible=False)
         self.msg_text = ''
-        self.msg_pos_x = self.screen.WIDTH/4
+        # Catalog key of the current message, or None when it does not come from the catalog.
+        self.msg_key = None
+        # Set the texts of the current language.
+        self.set_texts()
+        # Horizontal position of the message, in logical units.
+        self.msg_pos_x = W/4
+        # Widgets in drawing order.
+        self.widgets = [getattr(self, name) for name in self.WIDGETS]
+        # Display revision the widgets were created for.
+        self.revision = self.screen.revision
+
+        # Renderer that only redraws the widgets that changed, in drawing order.
+        self.renderer = Renderer(self.surface, (255,255,255))
+        for widget in self.widgets:
+            self.renderer.add(widget)
+        # Index the new widgets for hit-testing.
+        self.input.set_widgets(self.widgets)
+
+    def set_texts(self):
+        '''
+        Sets the texts of the widgets from the current language.
+        '''
+        for name, field, key in self.TEXTS:
+            setattr(getattr(self, name), field, self.localization.get(key))
+        # The current message, if it came from the catalog.
+        if self.msg_key is not None:
+            self.msg_text = self.localization.get(self.msg_key)
+
+    def language_changed(self, language, stale_texts):
+        '''
+        Shows the texts of the new language (the renderer redraws the widgets whose text changed).
+
+        Parameters:
+        - language: The new language;
+        - stale_texts: Texts of the previous language that are no longer used.
+        '''
+        self.set_texts()
+
+    def unload(self):
+        '''
+        Called by the SceneManager before the screen is released: stops following language changes,
+        the panel animation and the API worker. The SceneManager then drops the rendered texts of the screen.
+        '''
+        self.localization.unsubscribe(self.language_changed)
+        animator.cancel(self.panel)
+        self.auth.stop()
+
+    def show_message(self, key):
+        '''
+        Shows a message from the catalog, kept by key so it follows language changes.
+
+        Parameters:
+        - key: The catalog key (e.g. 'error_code07').
+        '''
+        self.msg_key = key
+        self.msg_text = self.localization.get(key)
+
+    def resize(self):
+        '''
+        Adapts the menu to a new display.
+        Scaled canvases only need the new mouse ratio; native canvases are rebuilt at the new resolution, keeping their state.
+        '''
+        if not self.screen.native and self.surface is not self.screen.display_surf:
+            for widget in self.widgets:
+                widget.aspect_ratio = self.screen.widget_ratio
+            self.revision = self.screen.revision
+            return
+        old_layout = self.layout
+        old_widgets = dict(zip(self.WIDGETS, self.widgets))
+        msg_text, msg_key, msg_pos_x = self.msg_text, self.msg_key, self.msg_pos_x
+        self.new_screen()
+        # Carry the interaction state over to the new widgets.
+        for name, old_widget in old_widgets.items():
+            widget = getattr(self, name)
+            for attr in ('visible', 'text', 'pressed', 'loading', 'start_blink'):
+                if hasattr(old_widget, attr):
+                    setattr(widget, attr, getattr(old_widget, attr))
+        # Move the panel to the same logical position and let its slide, if any, continue on the new panel.
+        factor = self.layout.scale_x / old_layout.scale_x
+        self.panel.x = old_widgets['panel'].x * factor
+        animator.retarget(old_widgets['panel'], self.panel, factor)
+        self.msg_text, self.msg_key, self.msg_pos_x = msg_text, msg_key, msg_pos_x
+        # Rebuild the hit index for the new widgets (focus carries over with the copied pressed state).
+        self.input.set_widgets(self.widgets)
     
     def run(self):
         '''
         Main loop to handle menu logic.
         '''
+        # Adapt to a new display before handling the frame.
+        if self.revision != self.screen.revision:
+            self.resize()
+        profiler = self.screen.profiler
         # Process events.
         self.events()
+        profiler.mark('events')
         # Update logic (if any).
         self.update()
+        profiler.mark('update')
         # Render menu elements.
         self.draw()
         # Handle user interactions.
         self.inputs()
+        profiler.mark('inputs')
     
+    def panel_covers_sing_in(self):
+        '''
+        Called when the panel arrives on the left: the sign-in form is hidden and cleared and the sign-up form is used.
+        '''
+        self.panel_sing_in_button.visible = True
+        self.sing_in_username_tb.text = ''
+        self.sing_in_username_tb.visible = False
+        self.sing_in_password_tb.text = ''
+        self.sing_in_password_tb.visible = False
+        self.forgot_password_button.visible = False
+        self.sing_in_button.visible = False
+        self.msg_text = ''
+        self.msg_key = None
+        self.msg_pos_x = self.screen.WIDTH - self.screen.WIDTH/4
+
+    def panel_covers_sing_up(self):
+        '''
+        Called when the panel arrives on the right: the sign-up form is hidden and cleared and the sign-in form is used.
+        '''
+        self.panel_sing_up_button.visible = True
+        self.sing_up_password_tb.text = ''
+        self.sing_up_password_tb.visible = False
+        self.sing_up_username_tb.text = ''
+        self.sing_up_username_tb.visible = False
+        self.sing_up_confirm_password_tb.text = ''
+        self.sing_up_confirm_password_tb.visible = False
+        self.sing_up_button.visible = False
+        self.msg_text = ''
+        self.msg_key = None
+        self.msg_pos_x = self.screen.WIDTH/4
+
     def update(self):
         '''
-        Update menu components (currently unused).
-        '''
-        self.panel.update(self.screen.dt)
-        if self.panel.panel_rect.left < 0:
-            self.panel_sing_in_button.visible = True
-            self.panel.panel_rect.left = 0
-            self.panel.stop()
-
-            self.sing_in_username_tb.text = ''
-            self.sing_in_username_tb.visible = False
-            self.sing_in_password_tb.text = ''
-            self.sing_in_password_tb.visible = False
-            self.forgot_password_button.visible = False
-            self.sing_in_button.visible = False
-            self.msg_text = ''
-            self.msg_pos_x = self.screen.WIDTH - self.screen.WIDTH/4
-        
-        if self.panel.panel_rect.right > self.screen.WIDTH:
-            self.panel_sing_up_button.visible = True
-            self.panel.panel_rect.right = self.screen.WIDTH
-            self.panel.stop()
-
-            self.sing_up_password_tb.text = ''
-            self.sing_up_password_tb.visible = False
-            self.sing_up_username_tb.text = ''
-            self.sing_up_username_tb.visible = False
-            self.sing_up_confirm_password_tb.text = ''
-            self.sing_up_confirm_password_tb.visible = False
-            self.sing_up_button.visible = False
-            self.msg_text = ''
-            self.msg_pos_x = self.screen.WIDTH/4
+        Update menu components. The panel slide is advanced by the shared animator.
+        '''
+        # Wake up for the caret blink of the focused text box.
+        for text_box in (self.sing_in_username_tb, self.sing_up_username_tb, self.sing_in_password_tb, self.sing_up_password_tb, self.sing_up_confirm_password_tb):
+            if text_box.visible and text_box.pressed:
+                self.screen.wake_at(text_box.next_blink())
+
+        # Keep the message label in sync with the current message.
+        self.msg_text_text.text = self.msg_text
+        self.msg_text_text.pos = self.layout.pos(self.msg_pos_x, self.screen.HEIGHT - self.screen.HEIGHT/10)
 
     def events(self):
         '''
         Handle pygame events, including quitting the game.
         '''
-        for event in pygame.event.get():
+        events = self.screen.get_events()
+        # Take this frame's mouse and keyboard snapshot.
+        self.input.update()
+        for event in events:
             # Quit the game if the window is closed.
             if event.type == pygame.QUIT:
                 self.game.running = False
-            self.sing_in_username_tb.event(event)
-            self.sing_up_username_tb.event(event)
-            self.sing_in_password_tb.event(event)
-            self.sing_up_password_tb.event(event)
-            self.sing_up_confirm_password_tb.event(event)
+            # Let the screen handle display events.
+            self.screen.event(event)
+            # Handle responses from the authentication API.
+            if event.type == AUTH_RESPONSE:
+                self.auth_response(event)
+            # Keyboard input only goes to the focused text box.
+            self.input.dispatch(event)
         
     def draw(self):
         '''
-        Draw the menu on the screen.
-        '''
-        self.screen.scale_screen(self.surface)
-        self.surface.fill((255,255,255))
-
-        self.title.write(self.settings.game_texts['title'], (int(self.screen.WIDTH/4), int(self.screen.HEIGHT/4)), center_w=True, center_h=True)
-        self.title.write(self.settings.game_texts['create_account'], (int(self.screen.WIDTH - self.screen.WIDTH/4), int(self.screen.HEIGHT/4)), center_w=True, center_h=True)
-        self.sing_in_username_tb.draw()
-        self.sing_up_username_tb.draw()
-        self.sing_in_password_tb.draw()
-        self.sing_up_password_tb.draw()
-        self.sing_up_confirm_password_tb.draw()
-        self.forgot_password_button.draw(self.settings.game_texts['forgot_password'])
-        self.sing_in_button.draw(self.settings.game_texts['btn_sing_in'])
-        self.sing_up_button.draw(self.settings.game_texts['btn_sing_up'])
-        self.msg_text_text.write(self.msg_text, (self.msg_pos_x, self.screen.HEIGHT - self.screen.HEIGHT/10), center_w=True)
-        self.panel.draw()
-        self.panel_sing_up_button.draw(self.settings.game_texts['btn_sing_up'])
-        self.panel_sing_in_button.draw(self.settings.game_texts['btn_sing_in'])
-        
+        Draw the menu on the screen, redrawing and presenting only the regions that changed.
+        '''
+        rects = self.renderer.render()
+        self.screen.profiler.mark('draw')
+        self.screen.scale_screen(self.surface, rects)
+        self.screen.profiler.mark('scale')
 
     def inputs(self):
         '''
         Handle inputs, such as button clicks and slider interactions.
         '''
 
-        if self.panel_sing_in_button.click():
-            self.panel.velocity.x = 2000
+        if self.input.clicked(self.panel_sing_in_button):
+            self.panel.slide_to(self.surface.get_width() - self.panel.panel_rect.width, self.PANEL_SLIDE_TIME, on_complete=self.panel_covers_sing_up)
             self.panel_sing_in_button.visible = False
             self.sing_in_username_tb.visible = True
             self.sing_in_password_tb.visible = True
             self.forgot_password_button.visible = True
             self.sing_in_button.visible = True
         
-        if self.panel_sing_up_button.click():
-            self.panel.velocity.x = -2000
+        if self.input.clicked(self.panel_sing_up_button):
+            self.panel.slide_to(0, self.PANEL_SLIDE_TIME, on_complete=self.panel_covers_sing_in)
             self.panel_sing_up_button.visible = False
             self.sing_up_password_tb.visible = True
             self.sing_up_confirm_password_tb.visible = True
             self.sing_up_username_tb.visible = True
             self.sing_up_button.visible = True
             
-        if self.forgot_password_button.click():
+        if self.input.clicked(self.forgot_password_button):
             pass
         
-        if self.sing_in_button.click():
-            if self.sing_in_username_tb.text == '' or self.sing_in_password_tb.text == '':
-                self.msg_text = self.settings.game_texts['error_code07']
-            else:
-                json = {
-                    'username': self.sing_in_username_tb.text,
-                    'password': self.sing_in_password_tb.text
-                }
-                response = requests.post(API_SING_IN, json=json)
-                if response.status_code == 500:
-                    self.msg_text = self.settings.game_texts[f'error_code{response.json().get('error_code')}']
-                elif response.status_code == 200:
-                    if response.json().get('id'):
-                        self.msg_text = response.json().get('id')
-                    if response.json().get('msg_code'):
-                        self.msg_text = self.settings.game_texts[f'msg_code{response.json().get('msg_code')}']
-
-        if self.sing_up_button.click():
-            if self.sing_up_confirm_password_tb.text == '' or self.sing_up_password_tb.text == '' or self.sing_up_username_tb.text == '':
-                self.msg_text = self.settings.game_texts['error_code02']
-            elif self.sing_up_password_tb.text != self.sing_up_confirm_password_tb.text:
-                self.msg_text = self.settings.game_texts['error_code03']
-            elif any(char in self.sing_up_username_tb.text for char in  ' !@#$%^&*()/?:"<>|,.;'):
-                self.msg_text = self.settings.game_texts['error_code04']
-            elif self.sing_up_username_tb.text[0] in '0123456789':
-                self.msg_text = self.settings.game_texts['error_code05']
-            else:
-                json = {
-                    'username': self.sing_up_username_tb.text,
-                    'password': self.sing_up_password_tb.text,
-                    'confirm_password': self.sing_up_confirm_password_tb.text
-                }
-                response = requests.post(API_NEW_USER, json=json)
-                if response.status_code == 201:
-                    self.msg_text = self.settings.game_texts[f'msg_code{response.json().get('msg_code')}']
-                    self.sing_up_confirm_password_tb.text = ''
-                    self.sing_up_password_tb.text = ''
-                    self.sing_up_username_tb.text = ''
-                elif response.status_code in (400, 422, 500):
-                    self.msg_text = self.settings.game_texts[f'error_code{response.json().get('error_code')}']
+        if self.input.clicked(self.sing_in_button):
+            error = check_sing_in(self.sing_in_username_tb.text, self.sing_in_password_tb.text)
+            if error:
+                self.show_message(error)
+            elif self.auth.sing_in(self.sing_in_username_tb.text, self.sing_in_password_tb.text):
+                # Show the in-flight state until the response arrives.
+                self.sing_in_button.loading = True
+
+        if self.input.clicked(self.sing_up_button):
+            error = check_sing_up(self.sing_up_username_tb.text, self.sing_up_password_tb.text, self.sing_up_confirm_password_tb.text)
+            if error:
+                self.show_message(error)
+            elif self.auth.sing_up(self.sing_up_username_tb.text, self.sing_up_password_tb.text, self.sing_up_confirm_password_tb.text):
+                # Show the in-flight state until the response arrives.
+                self.sing_up_button.loading = True
 
         # Handle text_box interaction.
-        self.sing_in_username_tb.click()
-        self.sing_up_username_tb.click()
-        self.sing_in_password_tb.click()
-        self.sing_up_password_tb.click()
-        self.sing_up_confirm_password_tb.click()
+        self.input.clicked(self.sing_in_username_tb)
+        self.input.clicked(self.sing_up_username_tb)
+        self.input.clicked(self.sing_in_password_tb)
+        self.input.clicked(self.sing_up_password_tb)
+        self.input.clicked(self.sing_up_confirm_password_tb)
+
+    def auth_response(self, event):
+        '''
+        Handles the result of a request sent by the AuthClient.
+
+        Parameters:
+        - event: The AUTH_RESPONSE event, with action, status_code and data attributes.
+        '''
+        if event.action == 'sing_in':
+            self.sing_in_button.loading = False
+            if event.status_code == 500:
+                self.show_message(self.localization.key('error_code', event.data.get('error_code')))
+            elif event.status_code == 200:
+                if event.data.get('id'):
+                    self.msg_text = event.data.get('id')
+                    self.msg_key = None
+                if event.data.get('msg_code'):
+                    self.show_message(self.localization.key('msg_code', event.data.get('msg_code')))
+            elif event.status_code is None:
+                # The API could not be reached or timed out.
+                self.show_message('error_code01')
+
+        elif event.action == 'sing_up':
+            self.sing_up_button.loading = False
+            if event.status_code == 201:
+                self.show_message(self.localization.key('msg_code', event.data.get('msg_code')))
+                self.sing_up_confirm_password_tb.text = ''
+                self.sing_up_password_tb.text = ''
+                self.sing_up_username_tb.text = ''
+            elif event.status_code in (400, 422, 500):
+                self.show_message(self.localization.key('error_code', event.data.get('error_code')))
+            elif event.status_code is None:
+                # The API could not be reached or timed out.
+                self.show_message('error_code01')
@@ -1,34 +1,99 @@
+import time
+# Startup is timed from here, before the heavier imports.
+STARTED = time.perf_counter()
+import os
 import pygame
 from scripts.screen import Screen
 from scripts.settings import Settings
-from canvas.login import Login
+from scripts.gui import text_cache
+from scripts.assets import assets
+from scripts.localization import Localization
+from scripts.clock import clock
+from scripts.profiler import StartupTimer
+from scripts.scenes import SceneManager
 
 class Main():
     '''
     Manages the main loop and game states for the application.
     '''
-    def __init__(self):
+    def __init__(self, record=None, replay=None, startup_report=False, startup_budget=None):
         '''
         Initializes the game by setting up required components like settings, screen, and login.
+
+        Parameters:
+        - record: Path of a log to record the input of the session to. Default is None;
+        - replay: Path of a recorded log to replay headlessly, at full speed, instead of reading live input. Default is None;
+        - startup_report: Whether to print the time of each startup phase once the first frame is presented. Default is False;
+        - startup_budget: Time-to-first-frame budget in ms, reported when exceeded. Default is None.
         '''
-        # Initialize Pygame.
-        pygame.init()
+        # Time every startup phase up to the first frame presented.
+        self.startup = StartupTimer(STARTED)
+        self.startup.mark('imports')
+        self.startup_report = startup_report or startup_budget is not None
+        self.startup_budget = startup_budget
+        self.player = None
+        if replay:
+            from scripts.replay import Player
+            # Read the log first: a replay runs at the display size and render mode it was recorded with.
+            self.player = Player(replay)
+            # Replays run without a window.
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        # Initialize only the subsystems the game uses (pygame.init() would also open the audio device).
+        pygame.display.init()
+        pygame.font.init()
+        # Starting a timer brings up SDL's timer, which pygame.time.get_ticks needs.
+        pygame.time.set_timer(pygame.USEREVENT, 1000)
+        pygame.time.set_timer(pygame.USEREVENT, 0)
+        self.startup.mark('pygame')
         # Create an instance of the Settings class to manage configuration.
         self.settings = Settings()
+        if self.player is not None:
+            import tempfile
+            # Keep anything the replay changes out of the user's settings file.
+            self.settings.file_path = os.path.join(tempfile.mkdtemp(prefix='replay-'), 'settings.json')
+            width, height = self.player.size
+            self.settings.video.update({'width': width, 'height': height, 'render_mode': self.player.render_mode, 'idle': False, 'vsync': 0, 'resizable': False, 'disk_cache': False})
+        # Texts of the active language, loaded on first use.
+        self.localization = Localization(self.settings)
+        # Drop the rendered texts of the previous language when it changes.
+        self.localization.subscribe(lambda language, stale_texts: text_cache.evict(stale_texts))
+        self.disk_cache = None
+        if self.settings.video.disk_cache:
+            from scripts.diskcache import DiskCache
+            # Keep the static texts and decoded images across launches, the texts of each language in their own pack.
+            self.disk_cache = DiskCache(os.path.join(self.settings.path, 'cache'))
+            text_cache.disk = self.disk_cache.pack(f'text-{self.localization.language}')
+            assets.disk = self.disk_cache.pack('images')
+            self.localization.subscribe(self.language_changed)
+        self.startup.mark('settings')
         # Create an instance of the Screen class, passing the settings to configure the display.
         self.screen = Screen(self.settings)
+        self.startup.mark('window')
+        if self.player is not None:
+            # Recorded times start at 0.
+            clock.freeze(0)
+            self.screen.player = self.player
+        elif record:
+            from scripts.replay import Recorder
+            # Freeze the time before the widgets are created, so they start from the same time in the replay.
+            start = pygame.time.get_ticks()
+            clock.freeze(start)
+            self.screen.recorder = Recorder(record, self.screen.size, self.settings.video.render_mode, start)
         # A flag to control the main game loop.
         self.running = True
-        # Set the initial game state to 'login'.
-        self.game_state = 'login'
-        # Create an instance of the login class, passing the current Main instance for access to shared resources.
-        self.login = Login(self)
+        # Canvases by name, imported and built on first use.
+        self.scenes = SceneManager(self)
+        self.scenes.register('login', 'canvas.login:Login')
+        # Set the initial game state to 'login', building the login screen and loading its fonts.
+        self.scenes.switch('login')
+        self.startup.mark('first scene')
     
     def run(self):
         '''
         Runs the main game loop. 
         Continuously updates the game state and renders the screen until the game is exited.
         '''
+        start = time.perf_counter()
         while self.running:
             # Calculate the time elapsed since the last frame (delta time) for consistent animations and logic.
             self.screen.delta_time()
@@ -36,17 +101,51 @@ class Main():
             self.controller()
             # Refresh the screen to reflect changes.
             self.screen.screen_update()
+            if self.startup is not None:
+                self.startup.mark('first frame')
+                if self.startup_report:
+                    print(self.startup.report(self.startup_budget))
+                # Startup is over.
+                self.startup = None
+        if self.screen.recorder is not None:
+            self.screen.recorder.close()
+        if self.player is not None:
+            # Report how fast the log replayed, so recorded scenarios can serve as benchmarks.
+            elapsed = time.perf_counter() - start
+            stats = self.screen.profiler.stats()
+            print(f"Replayed {self.player.frames} frames in {elapsed:.2f} s ({self.player.frames / elapsed:.0f} FPS), "
+                  f"frame time p50 {stats['p50']:.3f} ms, p99 {stats['p99']:.3f} ms, max {stats['max']:.3f} ms")
+        # Keep the frame timings of the session, to diagnose hitches.
+        if self.settings.video.show_fps:
+            self.screen.profiler.dump(os.path.join(self.settings.path, 'profile.json'))
+        # Save any settings changed since the last write.
+        self.settings.flush()
+        # Keep what was rendered and decoded this session for the next launch.
+        if self.disk_cache is not None:
+            self.disk_cache.save()
         # Exit the game and clean up resources.
         pygame.quit()
 
+    def language_changed(self, language, stale_texts):
+        '''
+        Switches the text pack of the disk cache to the new language.
+        '''
+        text_cache.disk = self.disk_cache.pack(f'text-{language}')
+
     def controller(self):
         '''
         Manages the game state and directs control to the appropriate handler for the current state.
         '''
-        # If the game is currently in the 'login' state, execute the login logic.
-        if self.game_state == 'login':
-            self.login.run()
+        # Run the current scene (and build the next likely one when idle).
+        self.scenes.run()
 
 # Ensure the script runs only if executed directly, not when imported.
 if __name__ == '__main__':
-    Main().run()
+    import argparse
+    parser = argparse.ArgumentParser(description='Pygame Login System.')
+    parser.add_argument('--record', metavar='LOG', help='Record the input of the session to a log file.')
+    parser.add_argument('--replay', metavar='LOG', help='Replay a recorded log headlessly, at full speed.')
+    parser.add_argument('--startup-report', action='store_true', help='Print the time of each startup phase, up to the first frame.')
+    parser.add_argument('--startup-budget', type=float, metavar='MS', help='Time-to-first-frame budget; implies --startup-report.')
+    args = parser.parse_args()
+    Main(record=args.record, replay=args.replay, startup_report=args.startup_report, startup_budget=args.startup_budget).run()
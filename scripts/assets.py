@@ -1,4 +1,327 @@
 import os
+import threading
+import pygame
+from scripts.diskcache import entry_key, source_hash
 
-COURIER_PRIME = os.path.join(os.getcwd(), 'assets/fonts/CourierPrime.ttf')
-COURIER_PRIME_BOLD = os.path.join(os.getcwd(), 'assets/fonts/CourierPrime-Bold.ttf')
+# Asset directory of the project, resolved from this file so the game can be launched from any directory.
+ASSETS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assets'))
+
+def asset_path(*parts):
+    '''
+    Returns the absolute path of a file in the assets directory.
+
+    Parameters:
+    - parts: Path components below assets/ (e.g. 'fonts', 'CourierPrime.ttf').
+    '''
+    return os.path.join(ASSETS_DIR, *parts)
+
+COURIER_PRIME = asset_path('fonts', 'CourierPrime.ttf')
+COURIER_PRIME_BOLD = asset_path('fonts', 'CourierPrime-Bold.ttf')
+
+class FontRegistry():
+    '''
+    Central registry of loaded fonts.
+    Each (path, size) pair is parsed once and the same pygame.font.Font object is shared by every widget.
+    '''
+    def __init__(self):
+        '''
+        Initializes an empty FontRegistry.
+        '''
+        # Loaded fonts by (path, size).
+        self.fonts = {}
+        # Lock serializing font loading between the game loop and preload threads.
+        self.lock = threading.Lock()
+
+    def get(self, path, size):
+        '''
+        Returns the font for the given path and size, loading it on first use.
+
+        Parameters:
+        - path: Path to the font file or None for the default font;
+        - size: Size of the font.
+        '''
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            with self.lock:
+                # Another thread may have loaded it while we waited for the lock.
+                font = self.fonts.get(key)
+                if font is None:
+                    font = pygame.font.Font(path, size)
+                    self.fonts[key] = font
+        return font
+
+    def preload(self, specs):
+        '''
+        Loads fonts on a background thread, so they are ready when the widgets are created.
+
+        Parameters:
+        - specs: Iterable of (path, size) tuples.
+
+        Returns:
+        - The started thread.
+        '''
+        specs = list(specs)
+        thread = threading.Thread(target=lambda: [self.get(path, size) for path, size in specs], name='font-preload', daemon=True)
+        thread.start()
+        return thread
+
+    def release(self, specs):
+        '''
+        Releases fonts no widget needs any more.
+
+        Parameters:
+        - specs: Iterable of (path, size) tuples.
+        '''
+        with self.lock:
+            for key in specs:
+                self.fonts.pop(key, None)
+
+    def clear(self):
+        '''
+        Releases every loaded font.
+        '''
+        with self.lock:
+            self.fonts.clear()
+
+# Registry shared by every widget.
+fonts = FontRegistry()
+
+class Atlas():
+    '''
+    Packs small images into large pages, row by row (shelf packing).
+    Many images then share a few surfaces: they convert in one call per page and blit from the same source.
+    '''
+    def __init__(self, page_size=1024, padding=1):
+        '''
+        Initializes an empty Atlas.
+
+        Parameters:
+        - page_size: Width and height of a page in pixels. Default is 1024;
+        - padding: Empty pixels around each image, so scaled blits never bleed into a neighbour. Default is 1.
+        '''
+        self.page_size = page_size
+        self.padding = padding
+        # Pages, as SRCALPHA surfaces, and the free shelf position on the last one: (x, y, shelf height).
+        self.pages = []
+        self.cursor = (0, 0, 0)
+        # Position of each image, as (page index, rect).
+        self.regions = {}
+
+    def fits(self, surface) -> bool:
+        '''
+        Checks whether an image is small enough to be packed.
+        '''
+        width, height = surface.get_size()
+        return max(width, height) + self.padding * 2 <= self.page_size // 4
+
+    def add(self, name, surface):
+        '''
+        Copies an image into the atlas.
+
+        Parameters:
+        - name: The image name;
+        - surface: The image.
+        '''
+        width, height = surface.get_size()
+        padding = self.padding
+        x, y, shelf = self.cursor
+        if not self.pages or x + width + padding * 2 > self.page_size:
+            # Start a new shelf below the current one.
+            x, y, shelf = 0, y + shelf, 0
+        if not self.pages or y + height + padding * 2 > self.page_size:
+            self.pages.append(pygame.Surface((self.page_size, self.page_size), pygame.SRCALPHA, 32))
+            x, y, shelf = 0, 0, 0
+        rect = pygame.Rect(x + padding, y + padding, width, height)
+        self.pages[-1].blit(surface, rect)
+        self.regions[name] = (len(self.pages) - 1, rect)
+        self.cursor = (x + width + padding * 2, y, max(shelf, height + padding * 2))
+
+class AssetManager():
+    '''
+    Loads images and fonts on a worker thread and hands out images in the display's pixel format.
+
+    - Images are read from assets/images and fonts registered in the shared FontRegistry, reporting progress as they load;
+    - Small images are packed into atlas pages; large ones are kept as they are;
+    - Converted surfaces (convert() for opaque images, convert_alpha() otherwise) are cached for the current
+      display format and converted again, on first use, after the display format changes.
+    '''
+    def __init__(self, directory=None, atlas_page_size=1024):
+        '''
+        Initializes the AssetManager.
+
+        Parameters:
+        - directory: Directory image names are relative to. Default is assets/images;
+        - atlas_page_size: Width and height of the atlas pages. Default is 1024.
+        '''
+        self.directory = directory or asset_path('images')
+        self.atlas = Atlas(atlas_page_size)
+        # Loaded images that are not in the atlas, by name.
+        self.images = {}
+        # Converted surfaces by name (images) or page index (atlas pages), for the display format in self.format.
+        self.converted = {}
+        self.format = None
+        # Lock protecting the images and the atlas between the worker and the game loop.
+        self.lock = threading.Lock()
+        # Number of assets loaded and requested by the running load.
+        self.loaded = 0
+        self.total = 0
+        self.worker = None
+        # On-disk pack of decoded images (see scripts.diskcache), or None.
+        self.disk = None
+
+    def read(self, name):
+        '''
+        Reads an image from disk and stores it, packed into the atlas if it is small.
+        '''
+        path = os.path.join(self.directory, name)
+        if self.disk is None:
+            surface = pygame.image.load(path)
+        else:
+            # Images decoded by a previous launch load straight from the disk cache, until the file changes.
+            key = entry_key((source_hash(path),))
+            surface = self.disk.get(key)
+            if surface is None:
+                surface = pygame.image.load(path)
+                self.disk.put(key, surface)
+        with self.lock:
+            if name in self.images or name in self.atlas.regions:
+                return
+            if self.atlas.fits(surface):
+                self.atlas.add(name, surface)
+                # The page changed, so its converted copy is out of date (surfaces already handed out stay valid).
+                self.converted.pop(('page', self.atlas.regions[name][0]), None)
+            else:
+                self.images[name] = surface
+
+    def load(self, images=(), font_specs=(), callback=None):
+        '''
+        Loads images and fonts on a worker thread.
+
+        Parameters:
+        - images: Image names, relative to the images directory;
+        - font_specs: Iterable of (path, size) tuples;
+        - callback: Called as callback(loaded, total) after each asset, on the worker thread. Default is None.
+
+        Returns:
+        - The started thread.
+        '''
+        jobs = [(self.read, name) for name in images] + [(fonts.get, *spec) for spec in font_specs]
+        self.loaded = 0
+        self.total = len(jobs)
+
+        def work():
+            for job, *args in jobs:
+                job(*args)
+                self.loaded += 1
+                if callback is not None:
+                    callback(self.loaded, self.total)
+        self.worker = threading.Thread(target=work, name='asset-loader', daemon=True)
+        self.worker.start()
+        return self.worker
+
+    def progress(self):
+        '''
+        Returns the share of the running load that is done, from 0.0 to 1.0.
+        '''
+        return self.loaded / self.total if self.total else 1.0
+
+    def wait(self):
+        '''
+        Blocks until the running load finishes.
+        '''
+        if self.worker is not None:
+            self.worker.join()
+
+    def check_format(self):
+        '''
+        Drops the converted surfaces if the display format changed since they were made.
+
+        Returns:
+        - False if there is no display to convert for, True otherwise.
+        '''
+        display = pygame.display.get_surface()
+        if display is None:
+            return False
+        display_format = (display.get_bitsize(), display.get_masks())
+        if display_format != self.format:
+            self.format = display_format
+            self.converted = {}
+        return True
+
+    def convert(self, surface):
+        '''
+        Returns a copy of a surface in the display format, keeping its transparency.
+        '''
+        if surface.get_flags() & pygame.SRCALPHA or surface.get_colorkey() is not None:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def page(self, index):
+        '''
+        Returns an atlas page in the display format.
+        '''
+        page = self.atlas.pages[index]
+        if not self.check_format():
+            return page
+        converted = self.converted.get(('page', index))
+        if converted is None:
+            converted = self.converted[('page', index)] = page.convert_alpha()
+        return converted
+
+    def region(self, name):
+        '''
+        Returns where an image is, for blits straight from its source: (surface, rect) with the atlas page and
+        the image's rect on it, or (image, None) for images outside the atlas.
+        Images that are not loaded yet are loaded now.
+
+        Parameters:
+        - name: The image name.
+        '''
+        with self.lock:
+            known = name in self.atlas.regions or name in self.images
+        if not known:
+            self.read(name)
+        with self.lock:
+            if name in self.atlas.regions:
+                index, rect = self.atlas.regions[name]
+                packed = True
+            else:
+                image = self.images[name]
+                packed = False
+        if packed:
+            return self.page(index), rect
+        if not self.check_format():
+            return image, None
+        converted = self.converted.get(name)
+        if converted is None:
+            converted = self.converted[name] = self.convert(image)
+        return converted, None
+
+    def image(self, name):
+        '''
+        Returns an image in the display format (for atlas images, a subsurface of the page sharing its pixels).
+
+        Parameters:
+        - name: The image name.
+        '''
+        surface, rect = self.region(name)
+        if rect is None:
+            return surface
+        key = ('region', name)
+        region = self.converted.get(key)
+        if region is None or region.get_parent() is not surface:
+            region = self.converted[key] = surface.subsurface(rect)
+        return region
+
+    def clear(self):
+        '''
+        Releases every loaded image.
+        '''
+        with self.lock:
+            self.images.clear()
+            self.atlas = Atlas(self.atlas.page_size)
+            self.converted = {}
+
+# Asset manager shared by the canvases.
+assets = AssetManager()
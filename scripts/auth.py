@@ -0,0 +1,180 @@
+import queue
+import threading
+import traceback
+import pygame
+
+# Custom Pygame event posted when an authentication request finishes.
+AUTH_RESPONSE = pygame.event.custom_type()
+
+def sing_in_body(username, password):
+    '''
+    Returns the JSON body of a sign-in request.
+    '''
+    return {'username': username, 'password': password}
+
+def sing_up_body(username, password, confirm_password):
+    '''
+    Returns the JSON body of a sign-up request.
+    '''
+    return {'username': username, 'password': password, 'confirm_password': confirm_password}
+
+class AuthClient():
+    '''
+    Sends sign-in and sign-up requests to the API on a worker thread.
+    Results are delivered back to the game loop as AUTH_RESPONSE events, so the window never waits on the network.
+    '''
+    def __init__(self, transport=None):
+        '''
+        Initializes the AuthClient and starts its worker thread.
+
+        Parameters:
+        - transport: The Transport used to send requests. Default is the shared transport, which applies timeouts and retries.
+        '''
+        # Pooled transport, so a slow backend cannot hang the worker forever and sessions are reused.
+        # The shared one is imported by the worker on the first request, keeping the networking modules off the startup path.
+        self.transport = transport
+        # Queue of requests waiting to be sent by the worker.
+        self.jobs = queue.Queue()
+        # Actions ('sing_in' or 'sing_up') currently in flight.
+        self.pending = set()
+        # Lock protecting the pending set, shared between the game loop and the worker.
+        self.lock = threading.Lock()
+        # Daemon thread so it never keeps the application alive on exit.
+        self.worker = threading.Thread(target=self.work, name='auth-client', daemon=True)
+        self.worker.start()
+
+    def is_pending(self, action) -> bool:
+        '''
+        Checks whether a request for the given action is still in flight.
+
+        Parameters:
+        - action: The action name ('sing_in' or 'sing_up').
+        '''
+        with self.lock:
+            return action in self.pending
+
+    def sing_in(self, username, password) -> bool:
+        '''
+        Queues a sign-in request.
+
+        Returns:
+        - True if the request was queued, False if a sign-in is already pending.
+        '''
+        return self.submit('sing_in', 'API_SING_IN', sing_in_body(username, password))
+
+    def sing_up(self, username, password, confirm_password) -> bool:
+        '''
+        Queues a sign-up request.
+
+        Returns:
+        - True if the request was queued, False if a sign-up is already pending.
+        '''
+        return self.submit('sing_up', 'API_NEW_USER', sing_up_body(username, password, confirm_password))
+
+    def submit(self, action, endpoint, json) -> bool:
+        '''
+        Queues a request unless another one with the same action is already pending.
+
+        Parameters:
+        - action: The action name, echoed back in the response event;
+        - endpoint: Name of the setting holding the API endpoint ('API_SING_IN' or 'API_NEW_USER');
+        - json: The request body.
+        '''
+        with self.lock:
+            # Drop repeat clicks while a request is in flight.
+            if action in self.pending:
+                return False
+            self.pending.add(action)
+        self.jobs.put((action, endpoint, json))
+        return True
+
+    def stop(self):
+        '''
+        Stops the worker thread once the requests already queued are sent. Requests submitted afterwards are never sent.
+        '''
+        self.jobs.put(None)
+
+    def work(self):
+        '''
+        Worker loop: sends queued requests and posts an AUTH_RESPONSE event for each one.
+
+        Event attributes:
+        - action: The action name given to submit;
+        - status_code: The HTTP status code, or None if the request failed to complete;
+        - data: The decoded JSON body (empty dict if missing or invalid).
+        '''
+        while True:
+            job = self.jobs.get()
+            # None is the stop sentinel sent by stop.
+            if job is None:
+                return
+            action, endpoint, json = job
+            status_code = None
+            data = {}
+            try:
+                status_code, data = self.send(endpoint, json)
+            except Exception:
+                # Any other failure is reported like a request that failed to complete, so the worker keeps running.
+                traceback.print_exc()
+            finally:
+                if not isinstance(data, dict):
+                    data = {}
+                with self.lock:
+                    self.pending.discard(action)
+                # Hand the result back to the game loop.
+                pygame.event.post(pygame.event.Event(AUTH_RESPONSE, action=action, status_code=status_code, data=data))
+
+    def send(self, endpoint, json):
+        '''
+        Sends a request from the worker thread.
+
+        Parameters:
+        - endpoint: Name of the setting holding the API endpoint;
+        - json: The request body.
+
+        Returns:
+        - Tuple (status_code, data): status_code is None if the request failed to complete,
+          data is the decoded JSON body (empty dict if missing or invalid).
+        '''
+        # Networking modules and the .env file load on the first request, on this thread, so they never delay the window.
+        import requests
+        from scripts import dotenv
+        if self.transport is None:
+            from scripts.transport import transport
+            self.transport = transport
+        status_code = None
+        data = {}
+        try:
+            response = self.transport.post(getattr(dotenv, endpoint), json=json)
+            status_code = response.status_code
+            data = response.json()
+        except (requests.RequestException, ValueError):
+            # Connection errors, timeouts and invalid bodies are reported with whatever was received.
+            pass
+        return status_code, data
+
+class OfflineAuthClient(AuthClient):
+    '''
+    AuthClient that never sends requests, used while replaying recorded input: the recorded
+    AUTH_RESPONSE events are replayed instead, so the replay does not depend on the network.
+    '''
+    def __init__(self):
+        '''
+        Initializes the OfflineAuthClient, without a worker thread.
+        '''
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def stop(self):
+        '''
+        Nothing to stop: there is no worker thread.
+        '''
+
+    def submit(self, action, endpoint, json) -> bool:
+        '''
+        Accepts the request without sending it.
+
+        Returns:
+        - Always True: a repeat click while the recorded request was in flight left the same state.
+        '''
+        return True
@@ -0,0 +1,38 @@
+import pygame
+
+class GameClock():
+    '''
+    Time source for time-based widget state (e.g. the caret blink).
+    Normally it reads the live time; while recording or replaying input it is frozen once per frame,
+    so a replay sees exactly the times the recording saw.
+    '''
+    def __init__(self):
+        '''
+        Initializes a live GameClock.
+        '''
+        # Time (in ms) returned until the next freeze, or None to read the live time.
+        self.frozen = None
+
+    def ticks(self):
+        '''
+        Returns the current time in ms, like pygame.time.get_ticks().
+        '''
+        return pygame.time.get_ticks() if self.frozen is None else self.frozen
+
+    def freeze(self, ticks):
+        '''
+        Fixes the time returned by ticks until the next freeze.
+
+        Parameters:
+        - ticks: Time in ms.
+        '''
+        self.frozen = ticks
+
+    def release(self):
+        '''
+        Goes back to reading the live time.
+        '''
+        self.frozen = None
+
+# Shared clock used by the widgets.
+clock = GameClock()
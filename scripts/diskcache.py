@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import shutil
+import struct
+import pygame
+
+# Layout version of the cache. Caches written by other versions are deleted.
+VERSION = 1
+# Pack header: magic, version and length of the JSON index that follows it.
+HEADER = struct.Struct('<4sHI')
+MAGIC = b'PLSC'
+# Pixel buffers start on multiples of this, so a pack can be memory-mapped and its buffers used in place.
+ALIGN = 64
+# Pixel formats, by bytes per pixel. BGRA matches the ARGB8888 surfaces SDL renders text and the display into.
+FORMATS = {'BGRA': 4, 'RGB': 3}
+
+# Content hashes of the source files, by (path, modification time, size).
+source_hashes = {}
+
+def source_hash(path):
+    '''
+    Returns a hash of the content of a source file (a font or an image), computed once per version of the file.
+
+    Parameters:
+    - path: Path of the file, or None for Pygame's default font.
+    '''
+    if path is None:
+        # The default font ships with Pygame.
+        return f'pygame-{pygame.version.ver}'
+    stat = os.stat(path)
+    stamp = (path, stat.st_mtime_ns, stat.st_size)
+    digest = source_hashes.get(stamp)
+    if digest is None:
+        with open(path, 'rb') as file:
+            digest = source_hashes[stamp] = hashlib.sha1(file.read()).hexdigest()
+    return digest
+
+def data_start(index_size):
+    '''
+    Returns the offset of the pixel data in a pack file whose index takes index_size bytes.
+    '''
+    start = HEADER.size + index_size
+    return start + -start % ALIGN
+
+def entry_key(parts):
+    '''
+    Returns the pack key of a tuple of key parts (source hashes, sizes, texts, colors...).
+    '''
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+class Pack():
+    '''
+    A file of raw pixel buffers with a JSON index, loaded in one read.
+    Surfaces are made straight from the loaded buffers with pygame.image.frombuffer, so a cached entry costs no decoding.
+
+    The pack is rewritten on save only when entries were added. Entries left unused this session are kept:
+    an entry is only ever asked for by its key, which changes with its source file (see source_hash), so it never goes stale.
+    '''
+    def __init__(self, path):
+        '''
+        Initializes the Pack, loading the file if it exists and was written by this version.
+
+        Parameters:
+        - path: Path of the pack file.
+        '''
+        self.path = path
+        # Entries of the file by key, as (offset, width, height, format).
+        self.index = {}
+        # Pixel data of the file.
+        self.data = memoryview(bytearray())
+        # Surfaces used or added this session, by key. Entries of the file are only made into surfaces when used.
+        self.surfaces = {}
+        self.added = False
+        self.load()
+
+    def load(self):
+        '''
+        Reads the pack file. A missing, truncated or outdated file leaves the pack empty.
+        '''
+        try:
+            with open(self.path, 'rb') as file:
+                data = bytearray(os.fstat(file.fileno()).st_size)
+                file.readinto(data)
+            magic, version, index_size = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                return
+            index = json.loads(data[HEADER.size:HEADER.size + index_size])
+        except (OSError, ValueError, struct.error):
+            return
+        # Offsets in the index are relative to the pixel data.
+        start = data_start(index_size)
+        for offset, width, height, pixel_format in index.values():
+            if pixel_format not in FORMATS or start + offset + width * height * FORMATS[pixel_format] > len(data):
+                return
+        self.index = index
+        self.data = memoryview(data)[start:]
+
+    def get(self, key):
+        '''
+        Returns the surface of an entry, or None if the pack does not have it.
+        '''
+        surf = self.surfaces.get(key)
+        if surf is None and key in self.index:
+            offset, width, height, pixel_format = self.index[key]
+            size = width * height * FORMATS[pixel_format]
+            # The surface shares the loaded buffer instead of copying it.
+            surf = self.surfaces[key] = pygame.image.frombuffer(self.data[offset:offset + size], (width, height), pixel_format)
+        return surf
+
+    def put(self, key, surf):
+        '''
+        Adds an entry, written on the next save.
+
+        Parameters:
+        - key: The entry key (see entry_key);
+        - surf: The surface. Only non-empty 32-bit surfaces with per-pixel alpha and opaque surfaces without colorkey are stored.
+        '''
+        if self.storable(surf):
+            self.surfaces[key] = surf
+            self.added = True
+
+    @staticmethod
+    def storable(surf) -> bool:
+        '''
+        Checks whether a surface survives the trip through a pack unchanged.
+        '''
+        if not surf.get_width() or not surf.get_height():
+            return False
+        if surf.get_flags() & pygame.SRCALPHA:
+            return surf.get_bitsize() == 32
+        return surf.get_colorkey() is None
+
+    def save(self):
+        '''
+        Writes the entries of the file and the ones added this session, if any was added.
+        '''
+        if not self.added:
+            return
+        index = {}
+        buffers = []
+        offset = 0
+        # Entries of the file are copied as they are, without going through a surface.
+        entries = []
+        for key, (entry_offset, width, height, pixel_format) in self.index.items():
+            size = width * height * FORMATS[pixel_format]
+            entries.append((key, self.data[entry_offset:entry_offset + size], width, height, pixel_format))
+        for key, surf in self.surfaces.items():
+            if key not in self.index:
+                pixel_format = 'BGRA' if surf.get_flags() & pygame.SRCALPHA else 'RGB'
+                entries.append((key, pygame.image.tobytes(surf, pixel_format), surf.get_width(), surf.get_height(), pixel_format))
+        for key, buffer, width, height, pixel_format in entries:
+            index[key] = [offset, width, height, pixel_format]
+            padding = -len(buffer) % ALIGN
+            buffers.append(bytes(buffer) + bytes(padding))
+            offset += len(buffer) + padding
+        index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+        header = HEADER.pack(MAGIC, VERSION, len(index_bytes)) + index_bytes
+        # The pixel data starts aligned too, right after the header.
+        start = data_start(len(index_bytes))
+        # Write to a temporary file first, so an interrupted save never leaves a broken pack.
+        temp_path = f'{self.path}.tmp'
+        data = bytearray().join(buffers)
+        with open(temp_path, 'wb') as file:
+            file.write(header + bytes(start - len(header)))
+            file.write(data)
+        os.replace(temp_path, self.path)
+        self.added = False
+        # The pack now holds the written file, so entries not used yet load from the new offsets.
+        self.index = {key: tuple(entry) for key, entry in index.items()}
+        self.data = memoryview(data)
+
+class DiskCache():
+    '''
+    Versioned on-disk cache of pixel data: pre-rendered static texts and decoded images.
+
+    Entries are grouped in packs (e.g. one per locale for texts) and keyed by the hash of the source file they come
+    from plus whatever else shapes the pixels (font size, text, color...), so they are invalidated when a source changes.
+    Packs are loaded when first used and saved at exit.
+    '''
+    def __init__(self, directory):
+        '''
+        Initializes the DiskCache, deleting the caches of other versions.
+
+        Parameters:
+        - directory: The cache directory.
+        '''
+        self.directory = os.path.join(directory, f'v{VERSION}')
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name != f'v{VERSION}':
+                    shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        # Loaded packs by name.
+        self.packs = {}
+
+    def pack(self, name):
+        '''
+        Returns a pack, loading it on first use.
+
+        Parameters:
+        - name: The pack name (e.g. 'text-en-US').
+        '''
+        pack = self.packs.get(name)
+        if pack is None:
+            pack = self.packs[name] = Pack(os.path.join(self.directory, f'{name}.bin'))
+        return pack
+
+    def save(self):
+        '''
+        Saves the packs that changed. Failing to write the cache is not an error: the next start renders again.
+        '''
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for pack in self.packs.values():
+                pack.save()
+        except OSError:
+            pass
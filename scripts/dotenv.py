@@ -1,6 +1,24 @@
-from dotenv import load_dotenv
 from os import getenv
-load_dotenv()
 
-API_NEW_USER = getenv('API_NEW_USER')
-API_SING_IN = getenv('API_SING_IN')
\ No newline at end of file
+# Settings read from the environment (and the .env file), loaded on first access so importing this module is free.
+NAMES = ('API_NEW_USER', 'API_SING_IN')
+loaded = False
+
+def load():
+    '''
+    Loads the .env file into the environment, once.
+    '''
+    global loaded
+    if not loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        loaded = True
+
+def __getattr__(name):
+    '''
+    Resolves API_NEW_USER and API_SING_IN on first access.
+    '''
+    if name in NAMES:
+        load()
+        return getenv(name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,7 +1,477 @@
 import pygame
 import time
+from collections import OrderedDict
+from scripts.assets import fonts
+from scripts.clock import clock
+from scripts.diskcache import entry_key, source_hash
+
+class TextCache():
+    '''
+    Least-recently-used cache of rendered text surfaces, shared by every text widget.
+    Text that does not change between frames is rendered once and then only blitted.
+    '''
+    def __init__(self, max_bytes=16*1024*1024):
+        '''
+        Initializes the TextCache.
+
+        Parameters:
+        - max_bytes: Memory cap for the cached surfaces in bytes. Default is 16 MiB.
+        '''
+        self.max_bytes = max_bytes
+        # Cached surfaces ordered from least to most recently used.
+        self.entries = OrderedDict()
+        # Memory currently used by the cached surfaces.
+        self.bytes = 0
+        # Hit and miss counters.
+        self.hits = 0
+        self.misses = 0
+        # On-disk pack of the static texts of the active locale (see scripts.diskcache), or None.
+        self.disk = None
+
+    def get(self, key):
+        '''
+        Returns the cached surface for the key, or None if it is not cached.
+
+        Parameters:
+        - key: Hashable key identifying the rendered text.
+        '''
+        surf = self.entries.get(key)
+        if surf is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Mark the entry as most recently used.
+        self.entries.move_to_end(key)
+        return surf
+
+    def put(self, key, surf):
+        '''
+        Stores a surface, evicting the least recently used entries to stay under the memory cap.
+
+        Parameters:
+        - key: Hashable key identifying the rendered text;
+        - surf: The rendered surface.
+        '''
+        old_surf = self.entries.pop(key, None)
+        if old_surf is not None:
+            self.bytes -= self.surface_bytes(old_surf)
+        self.entries[key] = surf
+        self.bytes += self.surface_bytes(surf)
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= self.surface_bytes(evicted)
+
+    def render(self, font, font_key, text, antialias, color, static=False, keys=None):
+        '''
+        Renders text through the cache.
+
+        Parameters:
+        - font: The pygame.font.Font used on a cache miss;
+        - font_key: Tuple (font path, font size) identifying the font;
+        - text: The string to render;
+        - antialias: Boolean to enable or disable antialiasing;
+        - color: Color of the text;
+        - static: Whether the text is a fixed caption, which may be kept in the on-disk cache across launches. Default is False;
+        - keys: Set the cache key is added to, so the caller knows which entries it uses (see discard). Default is None.
+
+        Returns:
+        - The rendered text surface.
+        '''
+        key = (font_key, text, antialias, tuple(color))
+        if keys is not None:
+            keys.add(key)
+        surf = self.get(key)
+        if surf is None:
+            if static and self.disk is not None:
+                # Captions rendered by a previous launch load straight from the disk cache.
+                disk_key = entry_key((source_hash(font_key[0]), font_key[1], text, antialias, tuple(color)))
+                surf = self.disk.get(disk_key)
+                if surf is None:
+                    surf = font.render(text, antialias, color)
+                    self.disk.put(disk_key, surf)
+            else:
+                surf = font.render(text, antialias, color)
+            self.put(key, surf)
+        return surf
+
+    def clear(self):
+        '''
+        Removes every cached surface.
+        '''
+        self.entries.clear()
+        self.bytes = 0
+
+    def evict(self, texts):
+        '''
+        Removes the cached surfaces of the given texts (e.g. the texts of a language that is no longer used).
+
+        Parameters:
+        - texts: Set of strings.
+        '''
+        for key in [key for key in self.entries if key[1] in texts]:
+            self.bytes -= self.surface_bytes(self.entries.pop(key))
+
+    def discard(self, keys):
+        '''
+        Removes the cached surfaces of the given keys (e.g. the texts rendered by the widgets of a scene being unloaded).
+
+        Parameters:
+        - keys: Iterable of cache keys, as collected by render.
+        '''
+        for key in keys:
+            surf = self.entries.pop(key, None)
+            if surf is not None:
+                self.bytes -= self.surface_bytes(surf)
+
+    def stats(self):
+        '''
+        Returns a dictionary with the hits, misses, number of entries and memory used by the cache.
+        '''
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries), 'bytes': self.bytes}
+
+    @staticmethod
+    def surface_bytes(surf):
+        '''
+        Returns the approximate memory used by a surface.
+        '''
+        return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+class TextLayout():
+    '''
+    Breaks text into lines: explicit newlines, word wrap to a width and ellipsis truncation to a number of lines.
+    Results are memoized per (font, text, width, max_lines), so a text is only laid out again when it changes.
+    '''
+    # Appended to the last line when the text does not fit in max_lines.
+    ELLIPSIS = '...'
+
+    def __init__(self, max_entries=1024):
+        '''
+        Initializes the TextLayout.
+
+        Parameters:
+        - max_entries: Number of layouts kept, least recently used first out. Default is 1024.
+        '''
+        self.max_entries = max_entries
+        # Layouts ordered from least to most recently used.
+        self.entries = OrderedDict()
+
+    def layout(self, font, font_key, text, width=0, max_lines=0):
+        '''
+        Returns the lines of a text.
+
+        Parameters:
+        - font: The pygame.font.Font used to measure the text;
+        - font_key: Tuple (font path, font size) identifying the font;
+        - text: The text, possibly with newlines;
+        - width: Maximum line width in pixels (0 for no wrapping);
+        - max_lines: Maximum number of lines, the last one ending with an ellipsis if the text is cut (0 for no limit).
+
+        Returns:
+        - A tuple of (line, line width) tuples, with at least one line.
+        '''
+        key = (font_key, text, width, max_lines)
+        lines = self.entries.get(key)
+        if lines is not None:
+            self.entries.move_to_end(key)
+            return lines
+        lines = []
+        for paragraph in text.split('\n'):
+            lines.extend(self.wrap(font, paragraph, width))
+        if max_lines and len(lines) > max_lines:
+            lines = lines[:max_lines]
+            lines[-1] = self.ellipsize(font, lines[-1], width)
+        lines = tuple((line, font.size(line)[0]) for line in lines)
+        self.entries[key] = lines
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return lines
+
+    def wrap(self, font, paragraph, width):
+        '''
+        Wraps a paragraph (text without newlines) to the width, breaking between words when possible.
+
+        Returns:
+        - The list of lines.
+        '''
+        if not width or font.size(paragraph)[0] <= width:
+            return [paragraph]
+        lines = []
+        line = ''
+        for word in paragraph.split(' '):
+            candidate = f'{line} {word}' if line else word
+            if font.size(candidate)[0] <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            line = word
+            # Words wider than the line are broken between characters.
+            while len(line) > 1 and font.size(line)[0] > width:
+                end = len(line) - 1
+                while end > 1 and font.size(line[:end])[0] > width:
+                    end -= 1
+                lines.append(line[:end])
+                line = line[end:]
+        lines.append(line)
+        return lines
+
+    def ellipsize(self, font, line, width):
+        '''
+        Ends a line with an ellipsis, removing characters until it fits the width.
+        '''
+        line = line.rstrip()
+        while line and width and font.size(line + self.ELLIPSIS)[0] > width:
+            line = line[:-1].rstrip()
+        return line + self.ELLIPSIS
+
+# Cache shared by every text widget.
+text_cache = TextCache()
+# Layouts shared by every text widget.
+text_layout = TextLayout()
+# Horizontal metrics of single glyphs, by (font key, character).
+glyph_metrics = {}
+
+def render_chrome(area, layers):
+    '''
+    Pre-renders widget chrome (backgrounds, shadows, borders) into a transparent surface.
+
+    Parameters:
+    - area: Rect covered by the chrome on the screen;
+    - layers: List of (color, rect, border_radius, width) tuples drawn in order, with rects in screen coordinates.
+
+    Returns:
+    - The rendered surface, to be blitted at area.topleft, or None if no layer draws anything.
+    '''
+    # Negative widths draw nothing (e.g. transparent buttons without border).
+    layers = [layer for layer in layers if layer[3] >= 0]
+    if not layers:
+        return None
+    surf = pygame.Surface(area.size, pygame.SRCALPHA)
+    for color, rect, border_radius, width in layers:
+        pygame.draw.rect(surf, color, rect.move(-area.x, -area.y), border_radius=border_radius, width=width)
+    return surf
+
+def linear(t):
+    '''
+    Constant speed.
+    '''
+    return t
+
+def ease_in_quad(t):
+    '''
+    Starts slow and accelerates (quadratic).
+    '''
+    return t * t
+
+def ease_out_quad(t):
+    '''
+    Starts fast and decelerates (quadratic).
+    '''
+    return t * (2 - t)
+
+def ease_in_out_quad(t):
+    '''
+    Accelerates, then decelerates (quadratic).
+    '''
+    return 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2
+
+def ease_out_cubic(t):
+    '''
+    Starts fast and decelerates (cubic).
+    '''
+    return 1 - (1 - t) ** 3
+
+def ease_in_out_cubic(t):
+    '''
+    Accelerates, then decelerates (cubic).
+    '''
+    return 4 * t * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 3 / 2
+
+# Easing curves by name, mapping the elapsed fraction of a tween (0 to 1) to the fraction of the way covered.
+EASINGS = {
+    'linear': linear,
+    'ease_in_quad': ease_in_quad,
+    'ease_out_quad': ease_out_quad,
+    'ease_in_out_quad': ease_in_out_quad,
+    'ease_out_cubic': ease_out_cubic,
+    'ease_in_out_cubic': ease_in_out_cubic
+}
+
+class Tween():
+    '''
+    Animates an attribute of an object from its current value to a target value over a fixed duration.
+    Values may be floats or vectors (anything supporting + and * by a float), and are never rounded,
+    so the object decides how to map them to pixels.
+    '''
+    def __init__(self, target, attribute, end, duration, easing='ease_in_out_cubic', on_complete=None):
+        '''
+        Initializes the Tween.
+
+        Parameters:
+        - target: The animated object;
+        - attribute: Name of the animated attribute;
+        - end: The value reached at the end;
+        - duration: Duration in seconds;
+        - easing: Name of an easing curve in EASINGS, or a function of the elapsed fraction. Default is 'ease_in_out_cubic';
+        - on_complete: Called without arguments once the end value is set. Default is None.
+        '''
+        self.target = target
+        self.attribute = attribute
+        self.start = getattr(target, attribute)
+        self.end = end
+        self.duration = duration
+        self.easing = EASINGS[easing] if isinstance(easing, str) else easing
+        self.on_complete = on_complete
+        # Seconds elapsed since the tween started.
+        self.elapsed = 0.0
+
+    def step(self, dt) -> bool:
+        '''
+        Advances the tween and sets the attribute.
+
+        Parameters:
+        - dt: Seconds since the last step.
+
+        Returns:
+        - True once the tween is finished.
+        '''
+        self.elapsed += dt
+        if self.elapsed >= self.duration:
+            setattr(self.target, self.attribute, self.end)
+            return True
+        setattr(self.target, self.attribute, self.start + (self.end - self.start) * self.easing(self.elapsed / self.duration))
+        return False
+
+    def scale(self, factor):
+        '''
+        Scales the start and end values, e.g. when the animated widget is rebuilt at another resolution.
+        '''
+        self.start = self.start * factor
+        self.end = self.end * factor
+
+class Animator():
+    '''
+    Steps every running tween once per frame, with the frame's dt.
+    The screen asks it whether anything is animating, to stay at the full frame rate until the last tween ends.
+    '''
+    def __init__(self):
+        '''
+        Initializes an Animator without tweens.
+        '''
+        # Running tweens, in start order.
+        self.tweens = []
+        # Number of tweens that ran to their end.
+        self.completed = 0
+
+    @property
+    def active(self) -> bool:
+        '''
+        Whether any tween is running.
+        '''
+        return bool(self.tweens)
+
+    def animate(self, target, attribute, end, duration, easing='ease_in_out_cubic', on_complete=None):
+        '''
+        Starts a tween (see Tween), replacing the one running on the same attribute, if any.
+
+        Returns:
+        - The Tween.
+        '''
+        self.cancel(target, attribute)
+        tween = Tween(target, attribute, end, duration, easing, on_complete)
+        self.tweens.append(tween)
+        return tween
+
+    def get(self, target, attribute):
+        '''
+        Returns the tween running on an attribute, or None.
+        '''
+        for tween in self.tweens:
+            if tween.target is target and tween.attribute == attribute:
+                return tween
+        return None
+
+    def cancel(self, target, attribute=None):
+        '''
+        Stops the tweens running on an object, leaving the attributes where they are. Completion callbacks are not called.
+
+        Parameters:
+        - target: The animated object;
+        - attribute: Only stop the tween of this attribute. Default is None (every tween of the object).
+        '''
+        self.tweens = [tween for tween in self.tweens if tween.target is not target or (attribute is not None and tween.attribute != attribute)]
+
+    def clear(self):
+        '''
+        Stops every tween, without calling the completion callbacks.
+        '''
+        self.tweens = []
+
+    def retarget(self, old_target, new_target, factor=1):
+        '''
+        Moves the tweens of an object to its replacement, scaling their values, so they continue where they were.
+
+        Parameters:
+        - old_target: The object being replaced;
+        - new_target: The new object;
+        - factor: Scale factor of the values. Default is 1.
+        '''
+        for tween in self.tweens:
+            if tween.target is old_target:
+                tween.target = new_target
+                tween.scale(factor)
+
+    def step(self, dt):
+        '''
+        Advances every running tween, then calls the completion callbacks of the ones that finished.
+
+        Parameters:
+        - dt: Seconds since the last frame.
+        '''
+        if not self.tweens:
+            return
+        finished = [tween for tween in self.tweens if tween.step(dt)]
+        if finished:
+            self.tweens = [tween for tween in self.tweens if tween not in finished]
+            self.completed += len(finished)
+            # Callbacks run last, so they may start new tweens.
+            for tween in finished:
+                if tween.on_complete is not None:
+                    tween.on_complete()
+
+# Animator shared by every widget, stepped by the screen once per frame.
+animator = Animator()
+
+class Widget():
+    '''
+    Base for the widgets that take part in hit-testing (see scripts.input).
+    Showing, hiding or moving a widget bumps Widget.version, so hit indexes know when to rebuild.
+    '''
+    # Incremented whenever the visibility or the position of any widget changes.
+    version = 0
+
+    @staticmethod
+    def moved():
+        '''
+        Records that a widget moved or was resized, so hit indexes rebuild.
+        '''
+        Widget.version += 1
+
+    @property
+    def visible(self):
+        return self._visible
+
+    @visible.setter
+    def visible(self, value):
+        if value != getattr(self, '_visible', None):
+            self._visible = value
+            Widget.version += 1
 
 class Text():
+    # Whether the texts of the widget are fixed captions (catalog texts), which the on-disk cache may keep.
+    # Typed text never is.
+    static = False
+
     def __init__(self, screen, text_color, text_antialias, font, font_size):
         '''
         Initializes a Text object for rendering text on the screen.
@@ -13,15 +483,74 @@ class Text():
         - font: Path to the font file or None for the default font;
         - font_size: Size of the font.
         '''
-        # Create a font object with the specified font and size.
-        self.text_font = pygame.font.Font(font, font_size)
+        # Get the shared font object for the specified font and size.
+        self.text_font = fonts.get(font, font_size)
+        # Key identifying the font in the shared text cache.
+        self.font_key = (font, font_size)
         # Store screen, text color, and antialiasing properties.
         self.screen = screen
         self.text_color = text_color
         self.text_antialias = text_antialias
+        # Keys of the text cache entries rendered by the widget, released with its scene.
+        self.cache_keys = set()
+
+    def render(self, text):
+        '''
+        Renders text with the current color through the shared text cache.
+
+        Parameters:
+        - text: The string to render.
+        '''
+        return text_cache.render(self.text_font, self.font_key, text, self.text_antialias, self.text_color, self.static, self.cache_keys)
+
+    def layout(self, text, width=0, max_lines=0):
+        '''
+        Lays out text through the shared text layout (see TextLayout.layout).
+        '''
+        return text_layout.layout(self.text_font, self.font_key, text, width, max_lines)
+
+    def block_rect(self, lines, pos, center_w=False, center_h=False):
+        '''
+        Returns the area covered by laid out lines.
+
+        Parameters:
+        - lines: Lines returned by layout;
+        - pos: Tuple (x, y) of the block;
+        - center_w: Whether the block is centered horizontally around pos[0];
+        - center_h: Whether the block is centered vertically around pos[1].
+
+        Returns:
+        - Tuple (x, y, width, height), which may not be whole pixels.
+        '''
+        width = max(line_width for _, line_width in lines)
+        height = self.text_font.get_linesize() * (len(lines) - 1) + self.text_font.get_height()
+        return (pos[0] - (width / 2 if center_w else 0), pos[1] - (height / 2 if center_h else 0), width, height)
+
+    def write_lines(self, lines, pos, center_w=False, center_h=False, align='left'):
+        '''
+        Draws laid out lines, each one rendered through the shared text cache.
+
+        Parameters:
+        - lines: Lines returned by layout;
+        - pos: Tuple (x, y) of the block;
+        - center_w: Whether the block is centered horizontally around pos[0];
+        - center_h: Whether the block is centered vertically around pos[1];
+        - align: Alignment of the lines inside the block, 'left', 'center' or 'right'. Default is 'left'.
+        '''
+        x, y, width, _ = self.block_rect(lines, pos, center_w, center_h)
+        line_height = self.text_font.get_linesize()
+        for line, line_width in lines:
+            if align == 'center':
+                line_x = x + (width - line_width) / 2
+            elif align == 'right':
+                line_x = x + width - line_width
+            else:
+                line_x = x
+            self.screen.blit(self.render(line), (line_x, y))
+            y += line_height
 
 class Label(Text):
-    def __init__(self, screen, text_color=(0,0,0), text_antialias=True, font=None, font_size=100, visible=True):
+    def __init__(self, screen, text_color=(0,0,0), text_antialias=True, font=None, font_size=100, visible=True, text='', pos=(0,0), center_w=False, center_h=False, width=0, max_lines=0, align=None, static=True):
         '''
         Initializes a Label object, inheriting from Text.
 
@@ -30,14 +559,32 @@ class Label(Text):
         - text_color: Color of the text (default is black);
         - text_antialias: Boolean to enable or disable antialiasing (default is True);
         - font: Path to the font file or None for the default font;
-        - font_size: Size of the font (default is 100).
+        - font_size: Size of the font (default is 100);
+        - text: Text drawn by draw() (default is '');
+        - pos: Position used by draw() (default is (0, 0));
+        - center_w: Whether draw() centers the text horizontally around pos[0] (default is False);
+        - center_h: Whether draw() centers the text vertically around pos[1] (default is False);
+        - width: Width the text is wrapped to (default is 0, no wrapping);
+        - max_lines: Maximum number of lines, cutting the text with an ellipsis (default is 0, no limit);
+        - align: Alignment of the lines, 'left', 'center' or 'right' (default is 'center' when center_w, otherwise 'left');
+        - static: Whether the label only shows fixed captions, which the on-disk cache may keep (default is True).
+          Labels showing server data must pass False.
         '''
         super().__init__(screen, text_color, text_antialias, font, font_size)
+        self.static = static
         self.visible = visible
+        # Retained state used by draw(), bounds() and signature().
+        self.text = text
+        self.pos = pos
+        self.center_w = center_w
+        self.center_h = center_h
+        self.width = width
+        self.max_lines = max_lines
+        self.align = align
     
     def write(self, text, pos, center_w=False, center_h=False):
         '''
-        Renders and draws text on the screen.
+        Lays out and draws text on the screen, line by line.
 
         Parameters:
         - text: The string to be displayed;
@@ -46,15 +593,33 @@ class Label(Text):
         - center_h: Boolean to center the text vertically around pos[1].
         '''
         if self.visible:
-            # Render the text as a surface with the specified font, color, and antialiasing.
-            text_surf = self.text_font.render(str(text), self.text_antialias, self.text_color)
-            # Calculate offsets for centering the text, if enabled.
-            center_width = text_surf.get_width() / 2 if center_w else 0
-            center_height = text_surf.get_height() / 2 if center_h else 0
-            # Blit the text surface onto the screen at the adjusted position.
-            self.screen.blit(text_surf, (pos[0] - center_width, pos[1] - center_height))
+            # Break the text into lines (memoized, so this only runs when the text changes).
+            lines = self.layout(str(text), self.width, self.max_lines)
+            align = self.align or ('center' if center_w else 'left')
+            self.write_lines(lines, pos, center_w, center_h, align)
+
+    def draw(self):
+        '''
+        Draws the label's retained text at its retained position.
+        '''
+        self.write(self.text, self.pos, self.center_w, self.center_h)
+
+    def bounds(self):
+        '''
+        Returns the rect covered by the label's retained text.
+        '''
+        x, y, width, height = self.block_rect(self.layout(str(self.text), self.width, self.max_lines), self.pos, self.center_w, self.center_h)
+        return pygame.Rect(int(x), int(y), width, height).inflate(2, 2)
+
+    def signature(self):
+        '''
+        Returns a tuple that changes whenever the label needs to be redrawn.
+        '''
+        return (self.visible, self.text, tuple(self.pos), self.center_w, self.center_h, self.width, self.max_lines, self.align, tuple(self.text_color))
 
 class TextButton(Text):
+    static = True
+
     def __init__(self, screen, text_color, text_antialias, font, font_size):
         '''
         Initializes a TextButton object, inheriting from Text.
@@ -68,44 +633,158 @@ class TextButton(Text):
         '''
         super().__init__(screen, text_color, text_antialias, font, font_size)
     
-    def write(self, text, pos, buttom_width, center=True):
+    def write(self, text, pos, buttom_width, center=True, max_lines=0):
         '''
-        Renders and draws text on the screen, optionally resizing it to fit within a button.
+        Draws text on the screen, wrapping it to fit within a button.
 
         Parameters:
         - text: The string to be displayed;
         - pos: Tuple (x, y) indicating the position on the screen;
         - buttom_width: The maximum width allowed for the text (0 for no limit);
         - center: Boolean to center the text both horizontally and vertically around pos;
+        - max_lines: Maximum number of lines, cutting the text with an ellipsis (0 for no limit).
+        '''
+        self.write_lines(self.text_lines(text, buttom_width, max_lines), pos, center, center, 'center' if center else 'left')
+
+    def text_lines(self, text, buttom_width, max_lines=0):
         '''
-        # Render the text as a surface.
-        text_surf = self.text_font.render(text, self.text_antialias, self.text_color)
-        # If the button's width is smaller than the text's width, scale the text down.
-        if buttom_width < text_surf.get_width() and buttom_width != 0:
-            # Scale the text surface to fit within the button width (subtracting 20 for padding).
-            text_surf = pygame.transform.scale_by(text_surf, (buttom_width-20) / text_surf.get_width())
-        # Calculate offsets for centering the text, if enabled.
-        center_width = text_surf.get_width() / 2 if center else 0
-        center_height = text_surf.get_height() / 2 if center else 0
-        # Blit the text surface onto the screen at the adjusted position.
-        self.screen.blit(text_surf, (pos[0] - center_width, pos[1] - center_height))
+        Lays out text to fit within a button.
+
+        Parameters:
+        - text: The string to be displayed;
+        - buttom_width: The button width (0 for no limit);
+        - max_lines: Maximum number of lines (0 for no limit).
+        '''
+        # The unwrapped layout is memoized, so checking whether the text fits costs no measuring after the first frame.
+        lines = self.layout(text)
+        if not buttom_width or max(line_width for _, line_width in lines) <= buttom_width:
+            return self.layout(text, 0, max_lines) if max_lines else lines
+        # Text wider than the button is wrapped, keeping 10 pixels of padding on each side.
+        return self.layout(text, max(1, buttom_width - 20), max_lines)
 
 class TextBoxContent(Text):
     def __init__(self, screen, text_color, text_antialias, font, font_size):
+        '''
+        Initializes a TextBoxContent object, which renders a single line of user input.
+        The line is kept in a persistent buffer: typing only renders the added glyphs, deleting only clears
+        the removed ones, and drawing blits the visible part of the buffer without allocating anything.
+
+        Parameters:
+        - screen: The Pygame screen where the text will be rendered;
+        - text_color: Color of the text;
+        - text_antialias: Boolean to enable or disable antialiasing;
+        - font: Path to the font file or None for the default font;
+        - font_size: Size of the font.
+        '''
         super().__init__(screen, text_color, text_antialias, font, font_size)
-        self.text_surf = self.text_font.render('', self.text_antialias, self.text_color)
-    
-    def write(self, text, pos, offset, text_box_size, padding, center_h=True):
-        self.text_surf = self.text_font.render(text, self.text_antialias, self.text_color)
+        # Persistent line buffer, grown when the text no longer fits.
+        self.line_surf = None
+        # Text currently rendered in the buffer, with the mask character (None for plain text) and color it was rendered with.
+        self.line_text = ''
+        self.line_mask = None
+        self.line_color = self.text_color
+        # X position where each rendered character starts, followed by the end of the line.
+        self.glyph_x = [0]
+        # Width in pixels of the rendered text.
+        self.text_width = 0
+        # Visible part of the buffer, updated in place.
+        self.clip_rect = pygame.Rect(0, 0, 0, 0)
+
+    def glyph_metrics(self, char):
+        '''
+        Returns the horizontal metrics of a character, cached per font.
+
+        Parameters:
+        - char: The character.
+
+        Returns:
+        - Tuple (advance, shift): how far the next character starts, and where the rendered glyph starts
+          relative to the pen position (negative when the glyph overhangs to the left).
+        '''
+        key = (self.font_key, char)
+        metrics = glyph_metrics.get(key)
+        if metrics is None:
+            font_metrics = self.text_font.metrics(char)
+            if font_metrics and font_metrics[0]:
+                metrics = (font_metrics[0][4], min(font_metrics[0][0], 0))
+            else:
+                # Characters missing from the font have no metrics: fall back to the rendered size.
+                metrics = (self.text_font.size(char)[0], 0)
+            glyph_metrics[key] = metrics
+        return metrics
+
+    def update_line(self, text, mask=None):
+        '''
+        Brings the line buffer up to date with the text, rendering only the glyphs that were added.
+
+        Parameters:
+        - text: The user text;
+        - mask: Character displayed instead of each character (e.g. '*' for passwords). Default is None.
+        '''
+        if self.line_color != self.text_color:
+            # A new color invalidates every rendered glyph.
+            self.line_color = self.text_color
+            self.line_mask = self.line_surf = None
+        if mask == self.line_mask and self.line_surf is not None and (text is self.line_text or (mask is not None and len(text) == len(self.line_text)) or text == self.line_text):
+            # Nothing changed.
+            return
+        # Length of the part that is already rendered correctly: the whole old line when characters were only
+        # appended. Any other edit blits the line again from the cached glyphs, since a removed glyph may
+        # overhang its neighbour.
+        common = 0
+        if mask == self.line_mask and self.line_surf is not None and len(text) > len(self.line_text) and (mask is not None or text.startswith(self.line_text)):
+            common = len(self.line_text)
+        # Drop the glyphs after the common part and compute where the new ones go.
+        del self.glyph_x[common+1:]
+        if common == 0:
+            # Like a normal render, the line starts far enough right for the first glyph's overhang.
+            self.glyph_x[0] = -self.glyph_metrics(mask or text[0])[1] if text else 0
+        x = self.glyph_x[common]
+        for char in text[common:]:
+            x += self.glyph_metrics(mask or char)[0]
+            self.glyph_x.append(x)
+        height = self.text_font.get_height()
+        # Glyphs may overhang their advance (e.g. 'w'), so keep some room after the last one.
+        if self.line_surf is None or x + height > self.line_surf.get_width():
+            # Grow the buffer (doubling its width) and render the whole line into it.
+            self.line_surf = pygame.Surface((max(x + height, 256, self.line_surf.get_width()*2 if self.line_surf else 0), height), pygame.SRCALPHA)
+            common = 0
+        # Clear everything after the common part. Transparent pixels carry the text color,
+        # so antialiased glyph edges blend exactly like a normal render.
+        start_x = self.glyph_x[common]
+        self.line_surf.fill((*self.text_color[:3], 0), (start_x, 0, self.line_surf.get_width() - start_x, height))
+        # Render only the new glyphs, from the shared text cache.
+        for index in range(common, len(text)):
+            char = mask or text[index]
+            self.line_surf.blit(self.render(char), (self.glyph_x[index] + self.glyph_metrics(char)[1], 0))
+        self.line_text = text
+        self.line_mask = mask
+        self.text_width = x
+
+    def write(self, text, pos, offset, text_box_size, padding, center_h=True, mask=None):
+        '''
+        Draws the visible part of the line.
+
+        Parameters:
+        - text: The user text;
+        - pos: Tuple (x, y) of the text box's top left corner;
+        - offset: Horizontal scroll of the text, in pixels;
+        - text_box_size: Tuple (width, height) of the text box;
+        - padding: Horizontal padding inside the text box;
+        - center_h: Whether to center the text vertically. Default is True;
+        - mask: Character displayed instead of each character. Default is None.
+        '''
+        self.update_line(text, mask)
+        if self.text_width == 0:
+            return
         center_height = text_box_size[1]/3 if center_h else 0
-        clip_surface = pygame.Surface(((text_box_size[0]-(padding*2)), text_box_size[1]), pygame.SRCALPHA)
-        clip_surface.fill((0,0,0,0))
-        clip_surface.blit(self.text_surf, (-offset, 0))
-        self.screen.blit(clip_surface, ((pos[0]+padding), pos[1]+center_height))
+        # Only the part of the buffer inside the text box is drawn.
+        self.clip_rect.update(offset, 0, min(text_box_size[0]-(padding*2), self.line_surf.get_width() - offset), self.line_surf.get_height())
+        self.screen.blit(self.line_surf, ((pos[0]+padding), pos[1]+center_height), self.clip_rect)
 
 ### REVIEW ###
-class Button(TextButton):
-    def __init__(self, screen, aspect_ratio, pos, size=(300, 100), text_color=(0,0,0), text_hover_color=(0,0,0), visible=True, text_antialias=True, text_font=None, text_font_size=100, button_color=(128,128,128), button_hover_color=(100,100,100), shadow_size=(0,0), shadow_color=(0,0,0), border=-1, border_color=(0,0,0), border_radius=0, transparency=0):
+class Button(TextButton, Widget):
+    def __init__(self, screen, aspect_ratio, pos, size=(300, 100), text_color=(0,0,0), text_hover_color=(0,0,0), visible=True, text_antialias=True, text_font=None, text_font_size=100, button_color=(128,128,128), button_hover_color=(100,100,100), shadow_size=(0,0), shadow_color=(0,0,0), border=-1, border_color=(0,0,0), border_radius=0, transparency=0, loading_text='...', text=''):
         '''
         Initializes the Button object, which inherits from the TextButton class.
 
@@ -125,7 +804,9 @@ class Button(TextButton):
         - border: Border thickness. Default is -1 (no border);
         - border_color: Color of the border. Default is black (0, 0, 0);
         - border_radius: Radius for rounded button corners. Default is 0;
-        - transparency: Transparency level. Default is 0 (fully opaque).
+        - transparency: Transparency level. Default is 0 (fully opaque);
+        - loading_text: Text displayed while the button's action is in flight. Default is '...';
+        - text: Text displayed when draw() is called without one. Default is ''.
         '''
         super().__init__(screen, text_color, text_antialias, text_font, text_font_size)
         self.screen = screen
@@ -170,44 +851,131 @@ class Button(TextButton):
         # Tracks whether the button is currently pressed.
         self.pressed = False
         self.visible = visible
+        # In-flight state: while True the button shows loading_text and ignores clicks.
+        self.loading = False
+        self.loading_text = loading_text
+        # Retained caption, used when draw() is called without text.
+        self.text = text
+        # Pre-rendered chrome for each state, by the values it was rendered from.
+        self.chrome = {}
         
-    def draw(self, text):
+    def draw(self, text=None):
         '''
         Draws the button on the screen.
 
         Parameters:
-        - text: Text to display on the button.
+        - text: Text to display on the button. Default is the retained text.
         '''
+        if text is None:
+            text = self.text
         if self.visible:
-            # Draw the shadow (background).
-            pygame.draw.rect(self.screen, self.shadow_color, self.shadow_rect, border_radius=self.border_radius, width=self.transparency)
-            # Draw the button (main rectangle).
-            pygame.draw.rect(self.screen, self.current_button_color, self.button_rect, border_radius=self.border_radius, width=self.transparency)
-            # Draw the border, if enabled.
-            pygame.draw.rect(self.screen, self.border_color, self.button_rect, border_radius=self.border_radius, width=self.border)
+            # Show the loading text while the button's action is in flight.
+            if self.loading:
+                text = self.loading_text
+            # Draw the shadow, the button and its border with a single blit.
+            chrome, offset = self.get_chrome()
+            if chrome is not None:
+                self.screen.blit(chrome, (self.shadow_rect.x + offset[0], self.shadow_rect.y + offset[1]))
             # Draw the text at the center of the button.
-            self.write(text, (self.button_rect.centerx, self.button_rect.centery), self.button_rect.width)
+            self.write(text, (self.button_rect.centerx, self.button_rect.centery), self.button_rect.width, max_lines=self.max_lines())
+
+    def max_lines(self):
+        '''
+        Returns the number of text lines that fit in the button (at least 1).
+        '''
+        return max(1, (self.button_rect.height - self.text_font.get_height()) // self.text_font.get_linesize() + 1)
+
+    def get_chrome(self):
+        '''
+        Returns the pre-rendered shadow, background and border for the current state (normal, hover or pressed).
+        The surfaces are rendered once per state and regenerated only when colors, size or shape change.
+
+        Returns:
+        - Tuple (surface or None, offset of the surface from the shadow rect).
+        '''
+        # Offset of the button from its shadow (changes while pressed).
+        offset = (self.button_rect.x - self.shadow_rect.x, self.button_rect.y - self.shadow_rect.y)
+        key = (tuple(self.current_button_color), tuple(self.shadow_color), tuple(self.border_color), offset, self.button_rect.size, self.border, self.border_radius, self.transparency)
+        chrome = self.chrome.get(key)
+        if chrome is None:
+            area = self.shadow_rect.union(self.button_rect)
+            surf = render_chrome(area, [(self.shadow_color, self.shadow_rect, self.border_radius, self.transparency), (self.current_button_color, self.button_rect, self.border_radius, self.transparency), (self.border_color, self.button_rect, self.border_radius, self.border)])
+            # Normal, hover and pressed states: anything beyond that means the style changed.
+            if len(self.chrome) >= 3:
+                self.chrome.clear()
+            # Keep the position relative to the shadow, which never moves.
+            chrome = self.chrome[key] = (surf, (area.x - self.shadow_rect.x, area.y - self.shadow_rect.y))
+        return chrome
+
+    def bounds(self):
+        '''
+        Returns the rect covered by the button, including its shadow and pressed position.
+        '''
+        rect = self.button_rect.union(self.shadow_rect)
+        # The pressed button moves onto its shadow, so cover both positions.
+        pressed_rect = self.button_rect.copy()
+        pressed_rect.center = (self.pos[0]+self.shadow_size[0], self.pos[1]+self.shadow_size[1])
+        # Text rendered wider or taller than the button (e.g. the loading text) may overflow it.
+        _, _, width, height = self.block_rect(self.text_lines(self.loading_text if self.loading else self.text, self.button_rect.width, self.max_lines()), (0, 0))
+        text_rect = pygame.Rect(0, 0, width, height)
+        text_rect.center = self.button_rect.center
+        text_rect.inflate_ip(2, 2)
+        return rect.union(pressed_rect).union(text_rect).inflate(2, 2)
+
+    def signature(self):
+        '''
+        Returns a tuple that changes whenever the button needs to be redrawn.
+        '''
+        return (self.visible, self.loading, self.text, self.button_rect.center, tuple(self.current_button_color), tuple(self.text_color))
+
+    def move(self, pos):
+        '''
+        Moves the button.
+
+        Parameters:
+        - pos: Tuple (x, y) of the new center of the button.
+        '''
+        self.pos = pos
+        self.button_rect.center = (pos[0], pos[1])
+        self.button_x = self.button_rect.x
+        self.button_y = self.button_rect.y
+        self.shadow_rect.center = (pos[0]+self.shadow_size[0], pos[1]+self.shadow_size[1])
+        self.moved()
+
+    def hit_rect(self):
+        '''
+        Returns the clickable area of the button on the canvas (its resting position).
+        '''
+        return pygame.Rect(self.button_x, self.button_y, self.button_rect.width, self.button_rect.height)
     
-    def click(self) -> bool:
+    def click(self, input=None) -> bool:
         '''
         Handles mouse interaction with the button.
 
+        Parameters:
+        - input: The Input snapshot of the current frame. Default is None (the mouse is read directly).
+
         Returns:
         - True if the button was clicked, False otherwise.
         '''
-        if self.visible:
-            # Get the current mouse position.
-            mouse_pos = pygame.mouse.get_pos()
-            # Adjust the button's clickable area based on the aspect ratio.
-            updated_rect = pygame.Rect(self.button_x*self.aspect_ratio[0], self.button_y*self.aspect_ratio[1], self.button_rect.width*self.aspect_ratio[0], self.button_rect.height*self.aspect_ratio[1])
-            # Check if the mouse is within the updated rectangle.
-            if updated_rect.collidepoint(mouse_pos):
+        if self.visible and not self.loading:
+            if input is not None:
+                # Use the frame snapshot, already in canvas coordinates.
+                hovered = input.hovered is self
+                mouse_pressed = input.mouse_buttons[0]
+            else:
+                # Adjust the button's clickable area based on the aspect ratio.
+                updated_rect = pygame.Rect(self.button_x*self.aspect_ratio[0], self.button_y*self.aspect_ratio[1], self.button_rect.width*self.aspect_ratio[0], self.button_rect.height*self.aspect_ratio[1])
+                hovered = updated_rect.collidepoint(pygame.mouse.get_pos())
+                mouse_pressed = pygame.mouse.get_pressed()[0]
+            # Check if the mouse is over the button.
+            if hovered:
                 # Change the button and text color for hover state.
                 self.current_button_color = self.button_hover_color
                 self.text_color = self.text_hover_color
                 
                 # Check if the left mouse button is pressed.
-                if pygame.mouse.get_pressed()[0]:
+                if mouse_pressed:
                     # Move the button slightly to simulate a press (with shadow offset).
                     self.button_rect.center = (self.pos[0]+self.shadow_size[0], self.pos[1]+self.shadow_size[1])
                     self.pressed = True
@@ -228,6 +996,8 @@ class Button(TextButton):
                 # Button was not clicked.
                 return False
         else:
+            # Hidden or loading buttons drop any press in progress.
+            self.pressed = False
             return False
 
 class Slider(Button):
@@ -273,22 +1043,40 @@ class Slider(Button):
         # Draw the slider pointer as a circle
         pygame.draw.circle(self.screen, (0,0,0), (self.button_x + self.pointer_pos, self.button_y+self.button_rect.height/2), radius=self.pointer_radius)
     
-    def click_slider(self):
+    def hit_rect(self):
+        '''
+        Returns the clickable area of the slider track on the canvas.
+        '''
+        return pygame.Rect(self.button_x + self.padding, self.button_y, self.button_rect.width-self.padding*2, self.button_rect.height)
+
+    def click_slider(self, input=None):
         '''
         Handles mouse interaction with the slider.
 
+        Parameters:
+        - input: The Input snapshot of the current frame. Default is None (the mouse is read directly).
+
         Returns:
         - True if the slider was clicked and value was updated;
         - False otherwise.
         '''
-        # Get the current mouse position.
-        mouse_pos = pygame.mouse.get_pos()
-        # Adjust the slider's clickable area based on the aspect ratio.
-        updated_rect = pygame.Rect((self.button_x + self.padding)*self.aspect_ratio[0], self.button_y*self.aspect_ratio[1], (self.button_rect.width-self.padding*2)*self.aspect_ratio[0], self.button_rect.height*self.aspect_ratio[1])
+        if input is not None:
+            # Use the frame snapshot, already in canvas coordinates.
+            mouse_pos = input.mouse_pos
+            updated_rect = self.hit_rect()
+            hovered = input.hovered is self
+            mouse_pressed = input.mouse_buttons[0]
+        else:
+            # Get the current mouse position.
+            mouse_pos = pygame.mouse.get_pos()
+            # Adjust the slider's clickable area based on the aspect ratio.
+            updated_rect = pygame.Rect((self.button_x + self.padding)*self.aspect_ratio[0], self.button_y*self.aspect_ratio[1], (self.button_rect.width-self.padding*2)*self.aspect_ratio[0], self.button_rect.height*self.aspect_ratio[1])
+            hovered = updated_rect.collidepoint(mouse_pos)
+            mouse_pressed = pygame.mouse.get_pressed()[0]
         # Check if the mouse is within the slider's clickable area.
-        if updated_rect.collidepoint(mouse_pos):
+        if hovered:
             # Check if the left mouse button is pressed.
-            if pygame.mouse.get_pressed()[0]:
+            if mouse_pressed:
                 # Update the pointer position relative to the mouse.
                 self.pointer_pos =  mouse_pos[0] - updated_rect.x
                 # Calculate the slider value based on the pointer's position.
@@ -299,7 +1087,7 @@ class Slider(Button):
         # Slider was not clicked or updated.
         return False
 
-class TextBox(TextBoxContent):
+class TextBox(TextBoxContent, Widget):
     def __init__(self, screen, aspect_ratio, pos, size=(300, 100), visible=True, display_text='', text_padding=10, password=False, text_color=(0,0,0), display_text_color=(0,0,0), text_antialias=True, text_font=None, text_font_size=40, tb_color=(128,128,128), border=-1, border_color=(0,0,0), border_radius=0, transparency=0):
         '''
         Initializes the TextBox object, which is used for user text input.
@@ -344,6 +1132,11 @@ class TextBox(TextBoxContent):
         self.display_text_label = Label(screen, font_size=text_font_size, font=text_font, text_color=display_text_color)
         self.bar_text_label = Label(screen, font_size=text_font_size, font=text_font)
         self.text_padding = text_padding
+        # Time (in ms) when the caret started blinking.
+        self.start_blink = 0
+        # Pre-rendered background and border, with the values it was rendered from.
+        self.chrome = None
+        self.chrome_key = None
         
     def draw(self):
         '''
@@ -353,51 +1146,110 @@ class TextBox(TextBoxContent):
         then renders the user input (text or masked if password) inside it.
         '''
         if self.visible:
-            # Draw the text box background and border
-            pygame.draw.rect(self.screen, self.tb_color, self.tb_rect, border_radius=self.border_radius, width=self.transparency)
-            pygame.draw.rect(self.screen, self.border_color, self.tb_rect, border_radius=self.border_radius, width=self.border)
-            # Adjust text offset if it overflows the text box width
-            if self.text_surf.get_width() > self.tb_rect.width:
-                self.offset = self.text_surf.get_width() - self.tb_rect.width
-            else:
-                self.offset = 0
-        
-            # If the text box is set to password mode, display '*' for each character typed
-            if self.password:
-                self.write(f'{'*'*len(self.text)}', (self.tb_x, self.tb_y), self.offset, (self.tb_rect.width, self.tb_rect.height), self.text_padding)
-            else:
-                # Otherwise, display the actual user text
-                self.write(self.text, (self.tb_x, self.tb_y), self.offset, (self.tb_rect.width, self.tb_rect.height), self.text_padding)
+            # Draw the pre-rendered text box background and border, regenerated only when colors, size or shape change.
+            key = (tuple(self.tb_color), tuple(self.border_color), self.tb_rect.size, self.border, self.border_radius, self.transparency)
+            if self.chrome_key != key:
+                self.chrome_key = key
+                self.chrome = render_chrome(self.tb_rect, [(self.tb_color, self.tb_rect, self.border_radius, self.transparency), (self.border_color, self.tb_rect, self.border_radius, self.border)])
+            if self.chrome is not None:
+                self.screen.blit(self.chrome, self.tb_rect)
+            # Scroll the text so its end stays visible if it overflows the text box.
+            self.scroll()
+            # In password mode, '*' is displayed for each character typed; otherwise the actual user text.
+            self.write(self.text, (self.tb_x, self.tb_y), self.offset, (self.tb_rect.width, self.tb_rect.height), self.text_padding, mask='*' if self.password else None)
             
             # Blinking logic
             if self.text == '':
                 self.display_text_label.write(self.display_text, (self.tb_x+self.text_padding, self.tb_y + self.tb_rect.height/3))
             if self.pressed:
-                self.blink_time = pygame.time.get_ticks() - self.start_blink
-                if self.blink_time <= 1000:
-                    self.bar_text_label.write('|', (self.tb_x+self.text_surf.width+self.text_padding/2, self.tb_y + self.tb_rect.height/2), center_h=True)
-                elif (self.blink_time//1000) % 2 == 0:
-                    self.bar_text_label.write('|', (self.tb_x+self.text_surf.width+self.text_padding/2, self.tb_y + self.tb_rect.height/2), center_h=True)
+                if self.caret_visible():
+                    self.bar_text_label.write('|', (self.tb_x+self.text_width-self.offset+self.text_padding/2, self.tb_y + self.tb_rect.height/2), center_h=True)
             else:
-                self.start_blink = pygame.time.get_ticks()
+                self.start_blink = clock.ticks()
+
+    def scroll(self):
+        '''
+        Updates the line buffer and the horizontal offset, so the end of the text stays inside the text box.
+        '''
+        self.update_line(self.text, '*' if self.password else None)
+        self.offset = max(0, self.text_width - (self.tb_rect.width - self.text_padding*2))
+
+    def caret_visible(self) -> bool:
+        '''
+        Checks whether the blinking caret is currently shown: on for the first second, then every other second.
+        '''
+        self.blink_time = clock.ticks() - self.start_blink
+        return self.blink_time <= 1000 or (self.blink_time//1000) % 2 == 0
+
+    def next_blink(self):
+        '''
+        Returns the time (in ms) of the next caret blink, so the frame scheduler can wake up for it.
+        '''
+        blink_time = clock.ticks() - self.start_blink
+        return self.start_blink + (blink_time//1000 + 1) * 1000 + 1
+
+    def bounds(self):
+        '''
+        Returns the rect covered by the text box, including the caret.
+        '''
+        # The caret follows the end of the visible text.
+        self.scroll()
+        caret_rect = self.bar_text_label.render('|').get_rect(midleft=(int(self.tb_x+self.text_width-self.offset+self.text_padding/2), int(self.tb_y + self.tb_rect.height/2)))
+        return self.tb_rect.union(caret_rect).inflate(2, 2)
+
+    def signature(self):
+        '''
+        Returns a tuple that changes whenever the text box needs to be redrawn.
+        '''
+        return (self.visible, self.text, self.display_text, self.pressed, self.pressed and self.caret_visible(), self.tb_rect.topleft)
+
+    def move(self, pos):
+        '''
+        Moves the text box.
+
+        Parameters:
+        - pos: Tuple (x, y) of the new center of the text box.
+        '''
+        self.pos = pos
+        self.tb_rect.center = (pos[0], pos[1])
+        self.tb_x = self.tb_rect.x
+        self.tb_y = self.tb_rect.y
+        self.moved()
+
+    def hit_rect(self):
+        '''
+        Returns the clickable area of the text box on the canvas.
+        '''
+        return self.tb_rect.copy()
     
-    def click(self):
+    def click(self, input=None):
         '''
         Handles mouse interaction with the text box.
 
+        Parameters:
+        - input: The Input snapshot of the current frame. Default is None (the mouse is read directly).
+
         Returns:
         - True if the text box was clicked;
         - False otherwise.
         '''
         if self.visible:
-            # Get the current mouse position
-            mouse_pos = pygame.mouse.get_pos()
-            # Adjust the text box rectangle for different screen aspect ratios
-            updated_rect = pygame.Rect(self.tb_x*self.aspect_ratio[0], self.tb_y*self.aspect_ratio[1], self.tb_rect.width*self.aspect_ratio[0], self.tb_rect.height*self.aspect_ratio[1])
+            if input is not None:
+                # Use the frame snapshot, already in canvas coordinates.
+                hovered = input.hovered is self
+                mouse_pressed = input.mouse_buttons[0]
+            else:
+                # Adjust the text box rectangle for different screen aspect ratios
+                updated_rect = pygame.Rect(self.tb_x*self.aspect_ratio[0], self.tb_y*self.aspect_ratio[1], self.tb_rect.width*self.aspect_ratio[0], self.tb_rect.height*self.aspect_ratio[1])
+                hovered = updated_rect.collidepoint(pygame.mouse.get_pos())
+                mouse_pressed = pygame.mouse.get_pressed()[0]
             # If the mouse click is within the text box, set the 'pressed' flag to True
-            if updated_rect.collidepoint(mouse_pos) and pygame.mouse.get_pressed()[0]:
+            if hovered and mouse_pressed:
+                # Restart the caret blink when the text box gains focus.
+                if not self.pressed:
+                    self.start_blink = clock.ticks()
                 self.pressed = True
-            elif pygame.mouse.get_pressed()[0]:
+            elif mouse_pressed:
                 # If mouse is released outside, set the 'pressed' flag to False
                 self.pressed = False
     
@@ -428,24 +1280,58 @@ class Panel():
     def __init__(self, screen, aspect_ratio, pos, size=(100,100), color=(128,128,128)):
         self.screen = screen
         self.aspect_ratio = aspect_ratio
+        # Position as floats, so animations move smoothly; the rect holds the rounded pixel position.
         self.pos = pygame.math.Vector2(pos[0], pos[1])
-        self.velocity = pygame.math.Vector2(0, 0)
-        self.acceleration = pygame.math.Vector2(0, 0)
         self.color = color
         self.panel_surf = pygame.Surface((size[0], size[1]), pygame.SRCALPHA)
         self.panel_rect = self.panel_surf.get_rect()
-        self.panel_rect.x = pos[0]
-        self.panel_rect.y = pos[1]
-    
-    def stop(self):
-        self.velocity.x = 0
-        self.pos = (self.panel_rect.x, self.panel_rect.y)
+        self.panel_rect.x = round(pos[0])
+        self.panel_rect.y = round(pos[1])
+
+    @property
+    def x(self):
+        return self.pos.x
+
+    @x.setter
+    def x(self, value):
+        self.pos.x = value
+        if round(value) != self.panel_rect.x:
+            self.panel_rect.x = round(value)
+            # The panel is drawn over the widgets, so hit indexes rebuild as it slides.
+            Widget.moved()
+
+    @property
+    def moving(self) -> bool:
+        '''
+        Whether the panel is sliding.
+        '''
+        return animator.get(self, 'x') is not None
+
+    def slide_to(self, x, duration, easing='ease_in_out_cubic', on_complete=None):
+        '''
+        Slides the panel horizontally.
+
+        Parameters:
+        - x: The final left position;
+        - duration: Duration of the slide in seconds;
+        - easing: The easing curve (see Tween). Default is 'ease_in_out_cubic';
+        - on_complete: Called once the panel arrives. Default is None.
+        '''
+        animator.animate(self, 'x', float(x), duration, easing, on_complete)
     
     def draw(self):
         self.panel_surf.fill(self.color)
         self.screen.blit(self.panel_surf, self.panel_rect)
+
+    def bounds(self):
+        '''
+        Returns the rect covered by the panel.
+        '''
+        return self.panel_rect.copy()
+
+    def signature(self):
+        '''
+        Returns a tuple that changes whenever the panel needs to be redrawn.
+        '''
+        return (self.panel_rect.topleft, self.panel_rect.size, tuple(self.color))
     
-    def update(self, dt):
-        self.pos += self.velocity * dt
-        self.panel_rect.x = self.pos[0]
-        self.panel_rect.y = self.pos[1]
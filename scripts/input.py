@@ -0,0 +1,150 @@
+import pygame
+from scripts.gui import Widget
+
+class HitIndex():
+    '''
+    Uniform grid over the canvas, mapping each cell to the widget hit-boxes that overlap it.
+    Finding the widget under a point only looks at one cell, however many widgets the screen has.
+    '''
+    def __init__(self, cell_size=128):
+        '''
+        Initializes an empty HitIndex.
+
+        Parameters:
+        - cell_size: Width and height of a grid cell, in canvas pixels. Default is 128.
+        '''
+        self.cell_size = cell_size
+        # Hit-boxes by (column, row), as (rect, widget) tuples from the bottom to the top widget.
+        self.cells = {}
+
+    def build(self, widgets):
+        '''
+        Rebuilds the index from the visible widgets.
+
+        Parameters:
+        - widgets: The widgets in drawing order (later widgets are on top).
+        '''
+        self.cells = {}
+        size = self.cell_size
+        for widget in widgets:
+            if not widget.visible:
+                continue
+            rect = widget.hit_rect()
+            if not rect.width or not rect.height:
+                continue
+            for column in range(rect.left // size, (rect.right - 1) // size + 1):
+                for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                    self.cells.setdefault((column, row), []).append((rect, widget))
+
+    def at(self, pos):
+        '''
+        Returns the top widget whose hit-box contains the position, or None.
+
+        Parameters:
+        - pos: Tuple (x, y) in canvas pixels.
+        '''
+        cell = self.cells.get((int(pos[0] // self.cell_size), int(pos[1] // self.cell_size)))
+        if cell:
+            for rect, widget in reversed(cell):
+                if rect.collidepoint(pos):
+                    return widget
+        return None
+
+class Input():
+    '''
+    Takes one snapshot of the mouse and keyboard per frame and routes input to the widgets that need it:
+    mouse interaction goes to the widget under the cursor and keyboard events to the focused widget.
+    '''
+    def __init__(self, screen, widgets=()):
+        '''
+        Initializes the Input.
+
+        Parameters:
+        - screen: The Screen, used to map the mouse position to the canvas;
+        - widgets: The canvas widgets in drawing order. Only Widget instances take part in hit-testing.
+        '''
+        self.screen = screen
+        self.index = HitIndex()
+        # Mouse position in canvas pixels, mouse buttons, keyboard modifiers and keys of the current frame.
+        self.mouse_pos = (0, 0)
+        self.mouse_buttons = (False, False, False)
+        self.mods = 0
+        self.keys = None
+        # Widget under the cursor in the current and in the previous frame.
+        self.hovered = None
+        self.previous = None
+        # Widget receiving keyboard events.
+        self.focused = None
+        # Widgets whose click() must run this frame.
+        self.targets = set()
+        self.set_widgets(widgets)
+
+    def set_widgets(self, widgets):
+        '''
+        Replaces the indexed widgets (e.g. after the canvas is rebuilt for a new layout).
+
+        Parameters:
+        - widgets: The canvas widgets in drawing order.
+        '''
+        self.widgets = [widget for widget in widgets if isinstance(widget, Widget)]
+        # Version of the widgets the index was built from; None forces a rebuild.
+        self.version = None
+        self.hovered = self.previous = None
+        # Keep the focus on the widget that already has it.
+        self.focused = next((widget for widget in self.widgets if hasattr(widget, 'event') and widget.pressed), None)
+
+    def update(self):
+        '''
+        Takes the snapshot for the current frame and finds the widgets that must handle it.
+        '''
+        # Rebuild the index only when a widget was shown, hidden or moved (see Widget.moved).
+        if self.version != Widget.version:
+            self.version = Widget.version
+            self.index.build(self.widgets)
+        # The screen reads the live state, or the recorded one while replaying.
+        mouse_pos, self.mouse_buttons, self.mods = self.screen.mouse_state()
+        ratio = self.screen.widget_ratio
+        self.mouse_pos = (mouse_pos[0] / ratio[0], mouse_pos[1] / ratio[1])
+        self.keys = self.screen.key_state()
+        self.previous = self.hovered
+        self.hovered = self.index.at(self.mouse_pos)
+        # The hovered widget, the one the cursor just left (to reset its hover state)
+        # and the focused one (which loses focus on a click elsewhere).
+        self.targets = {widget for widget in (self.hovered, self.previous, self.focused) if widget is not None}
+
+    def clicked(self, widget) -> bool:
+        '''
+        Runs the widget's mouse interaction if the current frame concerns it.
+
+        Parameters:
+        - widget: A Button, Slider or TextBox.
+
+        Returns:
+        - True if the widget was clicked, False otherwise.
+        '''
+        if widget not in self.targets:
+            return False
+        clicked = widget.click_slider(self) if hasattr(widget, 'click_slider') else widget.click(self)
+        # Widgets that take keyboard input keep the focus while pressed.
+        if hasattr(widget, 'event'):
+            if widget.pressed:
+                self.focused = widget
+            elif self.focused is widget:
+                self.focused = None
+        return bool(clicked)
+
+    def dispatch(self, event):
+        '''
+        Routes an event: keyboard events to the focused widget, mouse events to the hovered one.
+
+        Parameters:
+        - event: The Pygame event.
+        '''
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT):
+            widget = self.focused
+        elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION, pygame.MOUSEWHEEL):
+            widget = self.hovered
+        else:
+            return
+        if widget is not None and widget.visible and hasattr(widget, 'event'):
+            widget.event(event)
@@ -0,0 +1,132 @@
+import json
+import os
+import re
+import sys
+
+# Directory holding one catalog per locale, named <locale>.json (e.g. en-US.json).
+LOCALES_DIR = os.path.join(os.path.dirname(__file__), '..', 'config', 'locales')
+# Catalog keys of API message codes, e.g. 'error_code01' or 'msg_code02'.
+CODE_KEY = re.compile(r'^(error_code|msg_code)(\w+)$')
+
+def available_languages(directory=LOCALES_DIR):
+    '''
+    Returns the locales that have a catalog, without loading any of them.
+
+    Parameters:
+    - directory: The catalogs directory. Default is config/locales.
+    '''
+    return tuple(sorted(name[:-5] for name in os.listdir(directory) if name.endswith('.json')))
+
+class Localization():
+    '''
+    Provides the texts of the active language.
+    Only the active catalog (and the fallback one, when different) is loaded, on first use,
+    so startup time and memory do not grow with the number of locales.
+    '''
+    def __init__(self, settings, fallback='en-US', directory=LOCALES_DIR):
+        '''
+        Initializes the Localization and follows the language set in the settings.
+
+        Parameters:
+        - settings: The Settings instance, whose language.language_set selects the language;
+        - fallback: Language used for texts missing from the active catalog. Default is 'en-US';
+        - directory: The catalogs directory. Default is config/locales.
+        '''
+        self.settings = settings
+        self.directory = directory
+        self.fallback = fallback
+        self.language = settings.language.language_set
+        # Loaded catalogs by language.
+        self.catalogs = {}
+        # Message codes of each loaded catalog, by (prefix, code).
+        self.codes = {}
+        # Callbacks notified after the language changes.
+        self.subscribers = []
+        settings.subscribe('language', self.settings_changed)
+
+    def load(self, language):
+        '''
+        Returns the catalog of a language, loading it on first use.
+        Texts are interned, so widgets and caches comparing them share a single string per text.
+
+        Parameters:
+        - language: The locale name.
+        '''
+        catalog = self.catalogs.get(language)
+        if catalog is None:
+            with open(os.path.join(self.directory, f'{language}.json'), 'r', encoding='utf-8') as file:
+                catalog = {sys.intern(key): sys.intern(text) for key, text in json.load(file).items()}
+            self.catalogs[language] = catalog
+            # Resolve message codes once, so responses are looked up without building keys.
+            codes = self.codes[language] = {}
+            for key in catalog:
+                match = CODE_KEY.match(key)
+                if match:
+                    codes[match.groups()] = key
+        return catalog
+
+    def get(self, key):
+        '''
+        Returns the text for a key in the active language, falling back to the fallback language and then to the key itself.
+
+        Parameters:
+        - key: The text key (e.g. 'username').
+        '''
+        text = self.load(self.language).get(key)
+        if text is None and self.fallback != self.language:
+            text = self.load(self.fallback).get(key)
+        return key if text is None else text
+
+    def key(self, prefix, code):
+        '''
+        Returns the catalog key of an API message code, or 'error_code01' (Internal Server Error) for unknown codes.
+
+        Parameters:
+        - prefix: The code kind, 'error_code' or 'msg_code';
+        - code: The code sent by the API (e.g. '07').
+        '''
+        self.load(self.language)
+        return self.codes[self.language].get((prefix, code), 'error_code01')
+
+    def set_language(self, language):
+        '''
+        Switches the active language. The previous catalog is released and the subscribers are notified with
+        the texts that only existed in it, so rendered-text caches can drop exactly those.
+
+        Parameters:
+        - language: The new locale name.
+        '''
+        if language == self.language:
+            return
+        old_texts = set(self.load(self.language).values())
+        old_language = self.language
+        self.language = language
+        new_texts = set(self.load(language).values())
+        if old_language != self.fallback:
+            del self.catalogs[old_language]
+            del self.codes[old_language]
+        for callback in list(self.subscribers):
+            callback(language, old_texts - new_texts)
+
+    def subscribe(self, callback):
+        '''
+        Registers a callback for language changes.
+
+        Parameters:
+        - callback: Called as callback(language, stale_texts) after the language changes.
+        '''
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        '''
+        Removes a callback registered with subscribe.
+        '''
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def settings_changed(self, option, keys):
+        '''
+        Follows changes to language.language_set.
+        '''
+        if 'language_set' in keys:
+            self.set_language(self.settings.language.language_set)
@@ -0,0 +1,256 @@
+import json
+import time
+from array import array
+import pygame
+from scripts.assets import fonts
+
+class Profiler():
+    '''
+    Records how long each phase of a frame takes, keeping the last frames in fixed-size ring buffers,
+    so measuring never allocates and memory does not grow with the run time.
+
+    A frame is recorded with begin_frame, one mark per phase and end_frame.
+    '''
+    # Phases of a frame, in order.
+    PHASES = ('tick', 'events', 'update', 'draw', 'scale', 'inputs', 'present')
+
+    def __init__(self, size=600):
+        '''
+        Initializes the Profiler.
+
+        Parameters:
+        - size: Number of frames kept. Default is 600.
+        '''
+        self.size = size
+        # Seconds spent in each phase, per frame.
+        self.phases = {phase: array('d', bytes(8 * size)) for phase in self.PHASES}
+        # Seconds of work per frame (every phase) and seconds between the start of consecutive frames.
+        self.frames = array('d', bytes(8 * size))
+        self.intervals = array('d', bytes(8 * size))
+        # Slot of the next frame and number of frames recorded (up to size).
+        self.index = 0
+        self.count = 0
+        # Time spent in each phase of the current frame.
+        self.current = dict.fromkeys(self.PHASES, 0.0)
+        self.frame_start = None
+        self.last_mark = None
+
+    def begin_frame(self):
+        '''
+        Starts timing a frame.
+        '''
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.intervals[self.index] = now - self.frame_start
+        self.frame_start = self.last_mark = now
+
+    def mark(self, phase):
+        '''
+        Ends a phase: the time since the previous mark (or the start of the frame) is added to it.
+
+        Parameters:
+        - phase: One of PHASES.
+        '''
+        if self.last_mark is None:
+            return
+        now = time.perf_counter()
+        self.current[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        '''
+        Stores the current frame in the ring buffers.
+        '''
+        if self.frame_start is None:
+            return
+        index = self.index
+        total = 0.0
+        for phase, seconds in self.current.items():
+            self.phases[phase][index] = seconds
+            total += seconds
+            self.current[phase] = 0.0
+        self.frames[index] = total
+        self.index = (index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def recent(self, samples):
+        '''
+        Returns the recorded values of a ring buffer, from the oldest to the newest.
+        '''
+        if self.count < self.size:
+            return samples[:self.count]
+        return samples[self.index:] + samples[:self.index]
+
+    def stats(self):
+        '''
+        Summarizes the recorded frames.
+
+        Returns:
+        - A dictionary with the fps, the mean, p50, p99 and max frame time in ms and the mean time of each phase in ms.
+        '''
+        if not self.count:
+            return {'frames': 0, 'fps': 0, 'mean': 0, 'p50': 0, 'p99': 0, 'max': 0, 'phases': dict.fromkeys(self.PHASES, 0)}
+        frames = sorted(self.recent(self.frames))
+        intervals = [interval for interval in self.recent(self.intervals) if interval]
+        return {
+            'frames': self.count,
+            'fps': len(intervals) / sum(intervals) if intervals else 0,
+            'mean': sum(frames) / len(frames) * 1000,
+            'p50': frames[len(frames) // 2] * 1000,
+            'p99': frames[min(len(frames) - 1, int(len(frames) * 0.99))] * 1000,
+            'max': frames[-1] * 1000,
+            'phases': {phase: sum(samples) / self.count * 1000 for phase, samples in self.phases.items()}
+        }
+
+    def histogram(self, bounds=(1, 2, 4, 8, 16.7, 33.3, 50, 100)):
+        '''
+        Counts the recorded frames by frame time.
+
+        Parameters:
+        - bounds: Upper bounds of the buckets in ms; slower frames fall in a last, unbounded bucket.
+
+        Returns:
+        - A list of (upper bound in ms or None, number of frames) tuples.
+        '''
+        counts = [0] * (len(bounds) + 1)
+        for seconds in self.recent(self.frames):
+            milliseconds = seconds * 1000
+            bucket = next((index for index, bound in enumerate(bounds) if milliseconds <= bound), len(bounds))
+            counts[bucket] += 1
+        return list(zip(list(bounds) + [None], counts))
+
+    def dump(self, path):
+        '''
+        Writes the summary, the frame time histogram and the recorded frames to a JSON file.
+
+        Parameters:
+        - path: The file to write.
+        '''
+        frames = [{phase: round(seconds * 1000, 4) for phase, seconds in zip(self.PHASES, values)} for values in zip(*(self.recent(self.phases[phase]) for phase in self.PHASES))]
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'summary': self.stats(), 'histogram': self.histogram(), 'frames': frames}, file, indent=4)
+
+class StartupTimer():
+    '''
+    Times the phases of startup, from the first import to the first frame presented.
+    '''
+    def __init__(self, start=None):
+        '''
+        Initializes the StartupTimer.
+
+        Parameters:
+        - start: time.perf_counter() value startup began at. Default is None (now).
+        '''
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        # (phase, seconds) tuples, in order.
+        self.phases = []
+
+    def mark(self, phase):
+        '''
+        Ends a phase: the time since the previous mark (or the start) is recorded for it.
+        '''
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def total(self):
+        '''
+        Returns the seconds from the start to the last mark.
+        '''
+        return self.last - self.start
+
+    def report(self, budget=None):
+        '''
+        Returns the report as text: one line per phase with its time and share, then the total.
+
+        Parameters:
+        - budget: Time-to-first-frame budget in ms, flagged when exceeded. Default is None.
+        '''
+        total = self.total()
+        lines = ['Startup:']
+        for phase, seconds in self.phases:
+            lines.append(f'  {phase:<14} {seconds * 1000:8.1f} ms  {seconds / total * 100 if total else 0:5.1f}%')
+        lines.append(f"  {'total':<14} {total * 1000:8.1f} ms")
+        if budget is not None and total * 1000 > budget:
+            lines.append(f'  over budget by {total * 1000 - budget:.1f} ms (budget {budget:g} ms)')
+        return '\n'.join(lines)
+
+class Overlay():
+    '''
+    Frame statistics drawn over the display: FPS, p50/p99 frame time and a graph of the recent frame times.
+    The pixels under the overlay are saved before drawing it and restored after the frame is presented,
+    so canvases that keep their content on the display are never affected.
+    '''
+    def __init__(self, profiler, pos=(8, 8), size=(220, 72), refresh=0.25):
+        '''
+        Initializes the Overlay.
+
+        Parameters:
+        - profiler: The Profiler whose frames are shown;
+        - pos: Tuple (x, y) of the overlay on the display. Default is (8, 8);
+        - size: Tuple (width, height) of the overlay. Default is (220, 72);
+        - refresh: Seconds between updates of the statistics text. Default is 0.25.
+        '''
+        self.profiler = profiler
+        self.rect = pygame.Rect(pos, size)
+        self.refresh = refresh
+        self.font = fonts.get(None, 16)
+        # Persistent surfaces for the overlay and for the display pixels under it.
+        self.surf = pygame.Surface(size, pygame.SRCALPHA)
+        self.backup = None
+        self.text_surf = None
+        self.next_refresh = 0
+        # Display the backup was taken from, or None when there is nothing to restore.
+        self.saved_on = None
+
+    def draw(self, display_surf):
+        '''
+        Draws the overlay on the display, saving the pixels it covers.
+
+        Returns:
+        - The display rect covered by the overlay.
+        '''
+        rect = self.rect.clip(display_surf.get_rect())
+        if not rect.width or not rect.height:
+            return rect
+        if self.backup is None or self.backup.get_size() != rect.size:
+            self.backup = pygame.Surface(rect.size, 0, display_surf)
+        self.backup.blit(display_surf, (0, 0), rect)
+        self.saved_on = display_surf
+        now = time.perf_counter()
+        if now >= self.next_refresh or self.text_surf is None:
+            # Sorting the recorded frames is the expensive part, so the text is only refreshed a few times per second.
+            self.next_refresh = now + self.refresh
+            stats = self.profiler.stats()
+            self.text_surf = self.font.render(f"{stats['fps']:.0f} FPS  p50 {stats['p50']:.1f}  p99 {stats['p99']:.1f} ms", True, (255, 255, 255))
+        self.surf.fill((0, 0, 0, 160))
+        self.surf.blit(self.text_surf, (4, 4))
+        self.draw_graph()
+        display_surf.blit(self.surf, rect.topleft, (0, 0, rect.width, rect.height))
+        return rect
+
+    def draw_graph(self):
+        '''
+        Draws one bar per recent frame, scaled so 33.3 ms fills the graph, with a line at 16.7 ms (60 FPS).
+        '''
+        width, height = self.surf.get_size()
+        top = self.text_surf.get_height() + 8
+        graph_height = height - top - 4
+        profiler = self.profiler
+        bars = min(width - 8, profiler.count)
+        for offset in range(bars):
+            seconds = profiler.frames[(profiler.index - bars + offset) % profiler.size]
+            bar = min(graph_height, int(seconds * 1000 / 33.3 * graph_height))
+            color = (80, 220, 80) if seconds <= 1 / 60 else (240, 80, 60)
+            pygame.draw.line(self.surf, color, (4 + offset, height - 4), (4 + offset, height - 4 - bar))
+        target_y = height - 4 - graph_height // 2
+        pygame.draw.line(self.surf, (255, 255, 255, 120), (4, target_y), (width - 4, target_y))
+
+    def restore(self):
+        '''
+        Puts back the display pixels covered by the last draw.
+        '''
+        if self.saved_on is not None and self.saved_on is pygame.display.get_surface():
+            self.saved_on.blit(self.backup, self.rect.clip(self.saved_on.get_rect()).topleft)
+        self.saved_on = None
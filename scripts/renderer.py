@@ -0,0 +1,126 @@
+import pygame
+
+class Renderer():
+    '''
+    Retained-mode renderer that only redraws the regions of a surface whose widgets changed.
+
+    Every widget added to the renderer must provide:
+    - bounds(): The rect it covers on the surface;
+    - signature(): A hashable tuple that changes whenever it needs to be redrawn.
+    '''
+    def __init__(self, surface, background=(255,255,255), max_rects=16, full_ratio=0.6):
+        '''
+        Initializes the Renderer.
+
+        Parameters:
+        - surface: The surface the widgets are drawn on;
+        - background: Color used to clear dirty regions. Default is white (255, 255, 255);
+        - max_rects: Above this number of dirty regions the whole surface is redrawn. Default is 16;
+        - full_ratio: Above this fraction of the surface area the whole surface is redrawn. Default is 0.6.
+        '''
+        self.surface = surface
+        self.background = background
+        self.max_rects = max_rects
+        self.full_ratio = full_ratio
+        # Widgets in drawing order, as [widget, draw, signature, bounds] lists.
+        self.layers = []
+        # Regions invalidated manually since the last render.
+        self.invalid_rects = []
+        # Whether the whole surface must be redrawn on the next render.
+        self.full = True
+
+    def add(self, widget, draw=None):
+        '''
+        Adds a widget on top of the ones already added.
+
+        Parameters:
+        - widget: The widget to draw;
+        - draw: Callable that draws the widget. Default is widget.draw.
+        '''
+        self.layers.append([widget, draw or widget.draw, None, None])
+        self.full = True
+
+    def invalidate(self, rect=None):
+        '''
+        Forces a region to be redrawn on the next render.
+
+        Parameters:
+        - rect: The region to redraw. Default is None (the whole surface).
+        '''
+        if rect is None:
+            self.full = True
+        else:
+            self.invalid_rects.append(pygame.Rect(rect))
+
+    def collect(self):
+        '''
+        Compares every widget with its last drawn state.
+
+        Returns:
+        - A list with the previous and current bounds of every widget that changed.
+        '''
+        rects = self.invalid_rects
+        self.invalid_rects = []
+        for layer in self.layers:
+            widget = layer[0]
+            signature = widget.signature()
+            if signature != layer[2]:
+                # Clear the area the widget used to cover.
+                if layer[3] is not None:
+                    rects.append(layer[3])
+                layer[2] = signature
+                layer[3] = widget.bounds() if getattr(widget, 'visible', True) else None
+                # Paint the area it covers now.
+                if layer[3] is not None:
+                    rects.append(layer[3])
+        return rects
+
+    def merge(self, rects):
+        '''
+        Clips the dirty regions to the surface and merges the overlapping ones.
+
+        Parameters:
+        - rects: The dirty regions.
+
+        Returns:
+        - The merged regions, or the whole surface rect when redrawing everything is cheaper.
+        '''
+        surface_rect = self.surface.get_rect()
+        merged = []
+        for rect in rects:
+            rect = rect.clip(surface_rect)
+            if not rect.width or not rect.height:
+                continue
+            # Absorb every merged region this one overlaps.
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        area = sum(rect.width * rect.height for rect in merged)
+        if len(merged) > self.max_rects or area > surface_rect.width * surface_rect.height * self.full_ratio:
+            return [surface_rect]
+        return merged
+
+    def render(self):
+        '''
+        Redraws the dirty regions of the surface.
+
+        Returns:
+        - The list of redrawn regions (empty if nothing changed).
+        '''
+        rects = self.collect()
+        if self.full:
+            self.full = False
+            rects = [self.surface.get_rect()]
+        else:
+            rects = self.merge(rects)
+        for rect in rects:
+            # Restrict every draw call to the dirty region.
+            self.surface.set_clip(rect)
+            self.surface.fill(self.background, rect)
+            for widget, draw, _, bounds in self.layers:
+                if bounds is not None and bounds.colliderect(rect):
+                    draw()
+        self.surface.set_clip(None)
+        return rects
@@ -0,0 +1,277 @@
+import json
+import struct
+import pygame
+
+# Input log format: a header, then one record per frame followed by that frame's events.
+MAGIC = b'PLSR'
+VERSION = 2
+# Magic, version, display width and height, render mode.
+HEADER = struct.Struct('<4sHHH10s')
+# Time (ms since the recording started), dt (seconds), mouse x and y on the display, mouse buttons (bit mask),
+# keyboard modifiers, number of held keys and number of events. The scancodes of the held keys follow.
+FRAME = struct.Struct('<IdhhBHBH')
+SCANCODE = struct.Struct('<H')
+# Length of the keyboard state returned by pygame.key.get_pressed() (one entry per SDL scancode).
+SCANCODES = 512
+# Event type and payload size.
+EVENT = struct.Struct('<IH')
+# Payloads of the recorded event types.
+KEY = struct.Struct('<iHi')
+MOUSE_BUTTON = struct.Struct('<hhB')
+MOUSE_MOTION = struct.Struct('<hhhhB')
+MOUSE_WHEEL = struct.Struct('<ii')
+
+def buttons_mask(buttons):
+    '''
+    Packs a tuple of mouse button states into a bit mask.
+    '''
+    return sum(1 << index for index, pressed in enumerate(buttons[:8]) if pressed)
+
+def mask_buttons(mask):
+    '''
+    Unpacks a bit mask into a (left, middle, right) tuple of mouse button states.
+    '''
+    return tuple(bool(mask & (1 << index)) for index in range(3))
+
+def held_scancodes(keys):
+    '''
+    Returns the scancodes of the held keys of a keyboard state, at most 255.
+
+    Parameters:
+    - keys: The keyboard state, as returned by pygame.key.get_pressed().
+    '''
+    scancodes = []
+    scancode = -1
+    # The state cannot be iterated over, but the tuple methods it inherits find the held keys.
+    for _ in range(min(keys.count(True), 255)):
+        scancode = tuple.index(keys, True, scancode + 1)
+        scancodes.append(scancode)
+    return tuple(scancodes)
+
+def scancodes_keys(scancodes):
+    '''
+    Rebuilds a keyboard state, indexed by key constant like pygame.key.get_pressed(), from the scancodes of the held keys.
+    '''
+    pressed = [False] * SCANCODES
+    for scancode in scancodes:
+        if scancode < SCANCODES:
+            pressed[scancode] = True
+    return pygame.key.ScancodeWrapper(pressed)
+
+def encode_event(event):
+    '''
+    Returns the payload of an event, or None for events that are not recorded
+    (window and display events, which depend on the machine rather than on the user).
+
+    Parameters:
+    - event: The Pygame event.
+    '''
+    kind = event.type
+    if kind in (pygame.KEYDOWN, pygame.KEYUP):
+        return KEY.pack(event.key, event.mod, event.scancode) + getattr(event, 'unicode', '').encode('utf-8')
+    if kind == pygame.TEXTINPUT:
+        return event.text.encode('utf-8')
+    if kind in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        return MOUSE_BUTTON.pack(*event.pos, event.button)
+    if kind == pygame.MOUSEMOTION:
+        return MOUSE_MOTION.pack(*event.pos, *event.rel, buttons_mask(event.buttons))
+    if kind == pygame.MOUSEWHEEL:
+        return MOUSE_WHEEL.pack(event.x, event.y)
+    if kind == pygame.QUIT:
+        return b''
+    if pygame.USEREVENT <= kind < pygame.NUMEVENTS:
+        # Custom events (e.g. authentication responses) keep their attributes as JSON.
+        try:
+            return json.dumps(event.dict, separators=(',', ':')).encode('utf-8')
+        except (TypeError, ValueError):
+            return None
+    return None
+
+def decode_event(kind, payload):
+    '''
+    Rebuilds an event from its type and payload.
+
+    Parameters:
+    - kind: The event type;
+    - payload: The bytes written by encode_event.
+    '''
+    if kind in (pygame.KEYDOWN, pygame.KEYUP):
+        key, mod, scancode = KEY.unpack_from(payload)
+        return pygame.event.Event(kind, key=key, mod=mod, scancode=scancode, unicode=payload[KEY.size:].decode('utf-8'))
+    if kind == pygame.TEXTINPUT:
+        return pygame.event.Event(kind, text=payload.decode('utf-8'))
+    if kind in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        x, y, button = MOUSE_BUTTON.unpack(payload)
+        return pygame.event.Event(kind, pos=(x, y), button=button)
+    if kind == pygame.MOUSEMOTION:
+        x, y, rel_x, rel_y, buttons = MOUSE_MOTION.unpack(payload)
+        return pygame.event.Event(kind, pos=(x, y), rel=(rel_x, rel_y), buttons=mask_buttons(buttons))
+    if kind == pygame.MOUSEWHEEL:
+        x, y = MOUSE_WHEEL.unpack(payload)
+        return pygame.event.Event(kind, x=x, y=y)
+    if payload:
+        return pygame.event.Event(kind, json.loads(payload))
+    return pygame.event.Event(kind)
+
+class Recorder():
+    '''
+    Writes the input of every frame to a compact binary log: the frame time and dt, the mouse and keyboard state and the events.
+    Replaying the log with a Player reproduces the session frame by frame.
+    '''
+    def __init__(self, path, size, render_mode, start):
+        '''
+        Initializes the Recorder and writes the log header.
+
+        Parameters:
+        - path: The log file to write;
+        - size: Tuple (width, height) of the display, which mouse positions refer to;
+        - render_mode: The render mode ('scaled' or 'native');
+        - start: Time (in ms) the recording starts at; frame times are stored relative to it.
+        '''
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, size[0], size[1], render_mode.encode('ascii')))
+        self.start = start
+        self.frames = 0
+        # State of the current frame. The mouse and keyboard keep their last state in frames that do not poll them.
+        self.ticks = 0
+        self.dt = 0.0
+        self.mouse = (0, 0, 0, 0)
+        self.keys = ()
+        self.events = []
+
+    def begin_frame(self, ticks, dt):
+        '''
+        Starts a frame.
+
+        Parameters:
+        - ticks: Time of the frame in ms, as returned by pygame.time.get_ticks();
+        - dt: Delta time of the frame in seconds.
+        '''
+        self.ticks = ticks - self.start
+        self.dt = dt
+        self.events = []
+
+    def add_events(self, events):
+        '''
+        Adds the events handed to the game during the current frame.
+        '''
+        for event in events:
+            payload = encode_event(event)
+            if payload is not None:
+                self.events.append(EVENT.pack(event.type, len(payload)) + payload)
+
+    def set_mouse(self, pos, buttons, mods):
+        '''
+        Sets the mouse state of the current frame.
+
+        Parameters:
+        - pos: Tuple (x, y) of the mouse on the display;
+        - buttons: Tuple of mouse button states;
+        - mods: The keyboard modifiers.
+        '''
+        self.mouse = (int(pos[0]), int(pos[1]), buttons_mask(buttons), mods & 0xFFFF)
+
+    def set_keys(self, keys):
+        '''
+        Sets the keyboard state of the current frame.
+
+        Parameters:
+        - keys: The keyboard state, as returned by pygame.key.get_pressed().
+        '''
+        self.keys = held_scancodes(keys)
+
+    def end_frame(self):
+        '''
+        Writes the current frame to the log.
+        '''
+        self.file.write(FRAME.pack(self.ticks, self.dt, *self.mouse, len(self.keys), len(self.events)))
+        self.file.write(b''.join(SCANCODE.pack(scancode) for scancode in self.keys))
+        self.file.write(b''.join(self.events))
+        self.frames += 1
+
+    def close(self):
+        '''
+        Finishes the log.
+        '''
+        self.file.close()
+
+class Player():
+    '''
+    Reads a log written by a Recorder and hands out its frames: the frame time and dt, the mouse and keyboard state and the events.
+    Once every frame was played, a QUIT event ends the session.
+    '''
+    def __init__(self, path):
+        '''
+        Initializes the Player and reads the log header.
+
+        Parameters:
+        - path: The log file to read.
+
+        Raises:
+        - ValueError: If the file is not an input log of this version.
+        '''
+        with open(path, 'rb') as file:
+            self.data = file.read()
+        if len(self.data) < HEADER.size:
+            raise ValueError(f'{path} is not an input log')
+        magic, version, width, height, render_mode = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} input log')
+        # Display size and render mode of the recording; mouse positions are only meaningful with them.
+        self.size = (width, height)
+        self.render_mode = render_mode.rstrip(b'\0').decode('ascii')
+        self.offset = HEADER.size
+        self.frames = 0
+        self.finished = False
+        # State of the current frame.
+        self.ticks = 0
+        self.dt = 0.0
+        self.mouse_pos = (0, 0)
+        self.mouse_buttons = (False, False, False)
+        self.mods = 0
+        self.scancodes = ()
+        self.keys = scancodes_keys(())
+        self.events = []
+
+    def next_frame(self):
+        '''
+        Moves to the next frame of the log. A log cut short (e.g. by a crash while recording) ends at its last whole frame.
+
+        Returns:
+        - The delta time of the frame in seconds (0 once the log is finished).
+        '''
+        data = self.data
+        offset = self.offset
+        if not self.finished and len(data) - offset >= FRAME.size:
+            ticks, dt, x, y, buttons, mods, key_count, count = FRAME.unpack_from(data, offset)
+            offset += FRAME.size
+            keys_end = offset + key_count * SCANCODE.size
+            if len(data) >= keys_end:
+                scancodes = tuple(scancode for scancode, in SCANCODE.iter_unpack(data[offset:keys_end]))
+                offset = keys_end
+                events = []
+                for _ in range(count):
+                    if len(data) - offset < EVENT.size:
+                        break
+                    kind, size = EVENT.unpack_from(data, offset)
+                    offset += EVENT.size
+                    events.append(decode_event(kind, data[offset:offset + size]))
+                    offset += size
+                else:
+                    self.offset = offset
+                    self.frames += 1
+                    self.ticks = ticks
+                    self.dt = dt
+                    self.mouse_pos = (x, y)
+                    self.mouse_buttons = mask_buttons(buttons)
+                    self.mods = mods
+                    # The keyboard state is only rebuilt when the held keys change.
+                    if scancodes != self.scancodes:
+                        self.scancodes = scancodes
+                        self.keys = scancodes_keys(scancodes)
+                    self.events = events
+                    return dt
+        self.finished = True
+        self.dt = 0.0
+        self.events = [pygame.event.Event(pygame.QUIT)]
+        return self.dt
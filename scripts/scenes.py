@@ -0,0 +1,201 @@
+import importlib
+import threading
+from scripts.assets import fonts
+from scripts.gui import text_cache
+
+class Scene():
+    '''
+    Registration of a canvas in the SceneManager.
+    '''
+    def __init__(self, name, target, preload=(), keep=False):
+        '''
+        Initializes the Scene.
+
+        Parameters:
+        - name: The scene name;
+        - target: The canvas class, as 'module:Class' (e.g. 'canvas.login:Login'), imported on first use;
+        - preload: Names of the scenes likely to follow this one, prepared in the background while it runs;
+        - keep: Whether the canvas stays loaded when the scene is no longer reachable. Default is False.
+        '''
+        self.name = name
+        self.target = target
+        self.preload = tuple(preload)
+        self.keep = keep
+        # The canvas class once imported, and the canvas once constructed.
+        self.cls = None
+        self.canvas = None
+        # Background thread importing the class and loading its fonts, if started.
+        self.loader = None
+
+class SceneManager():
+    '''
+    Registers canvases by name and builds them only when needed.
+
+    - Canvas modules are imported and canvases constructed on first use, so startup only pays for the first scene;
+    - While a scene runs, the scenes it lists in preload are imported and their fonts loaded on a background
+      thread, then constructed on an idle frame, so switching to them is instant;
+    - On every switch, scenes that are neither current nor preloaded from it are unloaded, releasing their
+      surfaces, rendered texts and fonts.
+
+    Canvases are classes taking the game as their only argument, with a run() method called once per frame.
+    They may define FONTS, a tuple of (path, size) tuples to preload, unload(), called before they are released,
+    a renderer, fully redrawn when the scene becomes current again, and widgets, whose rendered texts are
+    dropped from the text cache on unload.
+    '''
+    def __init__(self, game):
+        '''
+        Initializes the SceneManager.
+
+        Parameters:
+        - game: The Main instance, passed to the canvases.
+        '''
+        self.game = game
+        # Registered scenes by name.
+        self.scenes = {}
+        # The scene being run, or None before the first switch.
+        self.current = None
+
+    def register(self, name, target, preload=(), keep=False):
+        '''
+        Registers a scene. Nothing is imported until the scene is used.
+
+        Parameters:
+        - name: The scene name;
+        - target: The canvas class, as 'module:Class';
+        - preload: Names of the scenes likely to follow this one. Default is ();
+        - keep: Whether the canvas is never unloaded. Default is False.
+        '''
+        self.scenes[name] = Scene(name, target, preload, keep)
+
+    @property
+    def canvas(self):
+        '''
+        The canvas of the current scene.
+        '''
+        return self.current.canvas
+
+    def load_class(self, scene):
+        '''
+        Imports the canvas class of a scene.
+        '''
+        if scene.cls is None:
+            module_name, _, class_name = scene.target.partition(':')
+            scene.cls = getattr(importlib.import_module(module_name), class_name)
+        return scene.cls
+
+    def font_specs(self, cls):
+        '''
+        Returns the fonts a canvas class uses, at the size the current layout asks for.
+        '''
+        layout = self.game.screen.layout
+        return [(path, layout.length(size)) for path, size in getattr(cls, 'FONTS', ())]
+
+    @staticmethod
+    def text_keys(canvas):
+        '''
+        Returns the text cache keys rendered by the widgets of a canvas.
+        '''
+        keys = set()
+        for widget in getattr(canvas, 'widgets', ()):
+            keys.update(getattr(widget, 'cache_keys', ()))
+        return keys
+
+    def prepare(self, scene):
+        '''
+        Background part of loading a scene: imports its class and loads its fonts.
+        '''
+        for path, size in self.font_specs(self.load_class(scene)):
+            fonts.get(path, size)
+
+    def preload(self, name):
+        '''
+        Starts preparing a scene on a background thread, unless it is already loaded or being prepared.
+
+        Parameters:
+        - name: The scene name.
+        '''
+        scene = self.scenes[name]
+        if scene.canvas is None and scene.loader is None:
+            scene.loader = threading.Thread(target=self.prepare, args=(scene,), name=f'scene-preload-{name}', daemon=True)
+            scene.loader.start()
+
+    def get(self, name):
+        '''
+        Returns the canvas of a scene, constructing it if needed.
+
+        Parameters:
+        - name: The scene name.
+        '''
+        scene = self.scenes[name]
+        if scene.canvas is None:
+            if scene.loader is not None:
+                # Let the background preparation finish instead of doing it twice.
+                scene.loader.join()
+                scene.loader = None
+            # Scenes that were not preloaded load their fonts here, as the canvas creates its widgets.
+            scene.canvas = self.load_class(scene)(self.game)
+        return scene.canvas
+
+    def switch(self, name):
+        '''
+        Makes a scene the current one, unloading the scenes that can no longer be reached
+        and starting to preload the ones that may follow.
+
+        Parameters:
+        - name: The scene name.
+        '''
+        canvas = self.get(name)
+        if self.current is not None and self.current.name != name and hasattr(canvas, 'renderer'):
+            # The display shows the previous scene, so nothing of this one can be reused.
+            canvas.renderer.invalidate()
+        self.current = self.scenes[name]
+        reachable = {name, *self.current.preload}
+        for scene in self.scenes.values():
+            if scene.name not in reachable and not scene.keep:
+                self.unload(scene.name)
+        for next_name in self.current.preload:
+            self.preload(next_name)
+
+    def unload(self, name):
+        '''
+        Releases the canvas of a scene and the rendered texts and fonts only it was using.
+
+        Parameters:
+        - name: The scene name.
+        '''
+        scene = self.scenes[name]
+        canvas = scene.canvas
+        if canvas is None:
+            return
+        if hasattr(canvas, 'unload'):
+            canvas.unload()
+        scene.canvas = None
+        # Texts and fonts still used by a loaded scene stay in the text cache and the registry.
+        in_use = set()
+        texts_in_use = set()
+        for other in self.scenes.values():
+            if other.canvas is not None:
+                in_use.update(self.font_specs(type(other.canvas)))
+                texts_in_use.update(self.text_keys(other.canvas))
+        text_cache.discard(self.text_keys(canvas) - texts_in_use)
+        fonts.release(spec for spec in self.font_specs(type(canvas)) if spec not in in_use)
+
+    def update(self):
+        '''
+        Constructs one prepared scene when the frame scheduler is idle, so the work does not land on a busy frame.
+        Call once per frame, after the current scene ran.
+        '''
+        if not self.game.screen.is_idle():
+            return
+        for name in self.current.preload if self.current is not None else ():
+            scene = self.scenes[name]
+            if scene.canvas is None and scene.loader is not None and not scene.loader.is_alive():
+                self.get(name)
+                return
+
+    def run(self):
+        '''
+        Runs a frame of the current scene.
+        '''
+        self.current.canvas.run()
+        self.update()
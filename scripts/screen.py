@@ -1,4 +1,9 @@
+import math
+from fractions import Fraction
 import pygame
+from scripts.profiler import Profiler, Overlay
+from scripts.clock import clock
+from scripts.gui import animator
 
 class Screen():
     '''
@@ -21,10 +26,26 @@ class Screen():
         # Default reference dimensions for screen scaling.
         self.WIDTH = 1280
         self.HEIGHT = 720
+        # Incremented every time the display is set up, so canvases can tell when to adapt to it.
+        self.revision = 0
         # Set up the screen using settings from the Settings instance.
-        self.set_screen(self.settings.video_settings['width'], self.settings.video_settings['height'], self.settings.video_settings['vsync'])
+        self.set_screen(self.settings.video.width, self.settings.video.height, self.settings.video.vsync)
         # Clock to manage frame timing.
         self.clock = pygame.time.Clock()
+        # Frame scheduler: the loop runs at the full rate until this time (in ms), then waits for events.
+        self.active_until = 0
+        # Earliest time (in ms) something on screen is scheduled to change, or None.
+        self.next_wake = None
+        # Events received while waiting, handed out by get_events before the rest of the queue.
+        self.events = []
+        # Per-phase frame timings, and the overlay showing them when show_fps is on.
+        self.profiler = Profiler()
+        self.overlay = Overlay(self.profiler)
+        # Recorder writing the input of every frame, or Player replaying a recorded log instead of live input.
+        self.recorder = None
+        self.player = None
+        # Adapt to video settings changed while running.
+        self.settings.subscribe('video', self.settings_changed)
 
     def set_screen(self, width, height, vsync):
         '''
@@ -39,25 +60,134 @@ class Screen():
         - display_surf: The main Pygame display surface;
         - width_ratio: The ratio between the current width and the default width;
         - height_ratio: The ratio between the current height and the default height;
-        - aspect_ratio: A tuple containing the width and height scaling ratios.
+        - aspect_ratio: A tuple containing the width and height scaling ratios;
+        - native: Whether canvases are drawn directly at the display resolution;
+        - layout: Layout converting logical coordinates to canvas pixels;
+        - widget_ratio: The ratio between the display and the canvas, used by widgets to map the mouse position.
         '''
-        self.display_surf = pygame.display.set_mode((width, height), vsync=vsync)
+        # A resizable window can be resized live by the user (see event).
+        flags = pygame.RESIZABLE if self.settings.video.resizable else 0
+        self.display_surf = pygame.display.set_mode((width, height), flags, vsync=vsync)
+        self.vsync = vsync
+        self.set_size(width, height)
+        # Set the window title.
+        pygame.display.set_caption('Pygame Login System')
+
+    def set_size(self, width, height):
+        '''
+        Recomputes everything that depends on the display size.
+
+        Parameters:
+        - width: The display width;
+        - height: The display height.
+        '''
+        self.size = (width, height)
         # Calculate scaling ratios based on the default dimensions.
         self.width_ratio = width / self.WIDTH
         self.height_ratio = height / self.HEIGHT
         self.aspect_ratio = (self.width_ratio, self.height_ratio)
-        # Set the window title.
-        pygame.display.set_caption('Pygame Login System')
+        # In 'native' mode canvases are laid out at the display resolution instead of being scaled from WIDTH x HEIGHT.
+        self.native = self.settings.video.render_mode == 'native'
+        if self.native:
+            self.layout = Layout(self.width_ratio, self.height_ratio)
+            self.widget_ratio = (1, 1)
+        else:
+            self.layout = Layout()
+            self.widget_ratio = self.aspect_ratio
+        self.revision += 1
+        # Surface regions aligned to this grid scale to whole display pixels, exactly like a full-frame scale.
+        self.scale_grid = (Fraction(width, self.WIDTH).denominator, Fraction(height, self.HEIGHT).denominator)
+        # Display regions waiting for the next screen_update.
+        self.update_rects = []
+        # A new display has no content yet, so the next frame must be presented in full.
+        self.full_update = True
     
-    def scale_screen(self, screen):
+    def new_canvas(self):
+        '''
+        Returns the surface a canvas should draw on: the display itself in 'native' mode,
+        otherwise a new WIDTH x HEIGHT surface that scale_screen scales to the display.
+        '''
+        if self.native:
+            return self.display_surf
+        return pygame.Surface((self.WIDTH, self.HEIGHT))
+
+    def scale_screen(self, screen, rects=None):
         '''
         Scales the provided surface to fit the display surface.
 
         Parameters:
-        - screen: The surface to scale.
+        - screen: The surface to scale;
+        - rects: Regions of the surface that changed. Default is None (the whole surface).
+        '''
+        if screen is self.display_surf:
+            # Native canvases are already on the display: only queue the regions to present.
+            if rects is None:
+                self.full_update = True
+            else:
+                self.update_rects.extend(rects)
+            return
+        if rects is None or self.full_update:
+            pygame.transform.scale(screen, self.display_surf.get_size(), self.display_surf)
+            self.full_update = True
+            return
+        surface_rect = screen.get_rect()
+        for rect in rects:
+            # Grow the region to the scale grid (when the grid is small enough to be worth it).
+            grid_x = self.scale_grid[0] if self.scale_grid[0] <= 64 else 1
+            grid_y = self.scale_grid[1] if self.scale_grid[1] <= 64 else 1
+            left = rect.left // grid_x * grid_x
+            top = rect.top // grid_y * grid_y
+            rect = pygame.Rect(left, top, math.ceil(rect.right / grid_x) * grid_x - left, math.ceil(rect.bottom / grid_y) * grid_y - top).clip(surface_rect)
+            # Display region covered by the surface region, rounded outwards.
+            left = int(rect.left * self.width_ratio)
+            top = int(rect.top * self.height_ratio)
+            right = min(math.ceil(rect.right * self.width_ratio), self.display_surf.get_width())
+            bottom = min(math.ceil(rect.bottom * self.height_ratio), self.display_surf.get_height())
+            display_rect = pygame.Rect(left, top, right - left, bottom - top)
+            if self.aspect_ratio == (1, 1):
+                # Same size: copy the region without scaling.
+                self.display_surf.blit(screen, display_rect, rect)
+            else:
+                self.display_surf.blit(pygame.transform.scale(screen.subsurface(rect), display_rect.size), display_rect)
+            self.update_rects.append(display_rect)
+
+    def event(self, event):
         '''
-        pygame.transform.scale(screen, self.display_surf.get_size(), self.display_surf)
+        Handles display events.
+
+        Parameters:
+        - event: The Pygame event.
+        '''
+        # The window content was lost (e.g. after being restored), so present it in full again.
+        if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+            self.full_update = True
+        # The user resized the window: adapt in place instead of recreating the display.
+        elif event.type in (pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED):
+            self.display_surf = pygame.display.get_surface()
+            width, height = self.display_surf.get_size()
+            if (width, height) != self.size:
+                self.set_size(width, height)
+                # Save the new size in a single write.
+                self.settings.set_section_settings('video', {'width': width, 'height': height})
     
+    def settings_changed(self, option, keys):
+        '''
+        Applies video settings changed while running. Size and vsync changes are applied by resize_screen and event.
+
+        Parameters:
+        - option: The changed category ('video');
+        - keys: The keys whose value changed.
+        '''
+        if 'show_fps' in keys:
+            # Present the whole frame, so the overlay appears or disappears at once.
+            self.full_update = True
+        if 'resizable' in keys:
+            # The window flags can only change by setting the display mode again.
+            self.set_screen(self.size[0], self.size[1], self.vsync)
+        elif 'render_mode' in keys:
+            # Canvases notice the new revision and adapt to the new mode.
+            self.set_size(self.size[0], self.size[1])
+
     def resize_screen(self, width, height, vsync):
         '''
         Resizes the game screen and updates the video settings.
@@ -68,28 +198,199 @@ class Screen():
         - vsync: A boolean indicating whether vsync is enabled.
 
         Steps:
-        - Updates the video settings in the Settings instance;
-        - Quits the current display and sets up a new one with the updated settings.
+        - Updates the video settings in the Settings instance with a single write;
+        - Resizes the display in place, only restarting it when vsync changes.
         '''
         # Update the video settings stored in the Settings object.
-        self.settings.set_settings('video', 'width', width)
-        self.settings.set_settings('video', 'height', height)
-        self.settings.set_settings('video', 'vsync', vsync)
-        # Restart the display to apply the new settings.
-        pygame.display.quit()
+        self.settings.set_section_settings('video', {'width': width, 'height': height, 'vsync': vsync})
+        # Changing vsync needs a new renderer, so restart the display in that case only.
+        if vsync != self.vsync:
+            pygame.display.quit()
         self.set_screen(width, height, vsync)
     
+    def keep_awake(self):
+        '''
+        Keeps the loop at the full frame rate for the next idle_delay seconds (e.g. during input or animation).
+        '''
+        self.active_until = pygame.time.get_ticks() + int(self.settings.video.idle_delay * 1000)
+
+    def is_idle(self) -> bool:
+        '''
+        Checks whether nothing is animating and nothing happened (no input) for the last idle_delay seconds.
+        '''
+        return not animator.active and pygame.time.get_ticks() >= self.active_until
+
+    def wake_at(self, ticks):
+        '''
+        Schedules a frame at the given time, even if no event arrives (e.g. for a caret blink).
+
+        Parameters:
+        - ticks: Time in ms, as returned by pygame.time.get_ticks().
+        '''
+        if self.next_wake is None or ticks < self.next_wake:
+            self.next_wake = ticks
+
+    def wait_for_event(self):
+        '''
+        Blocks until an event arrives, a scheduled wake is due or the idle frame interval passes.
+
+        Returns:
+        - True if the loop waited, False if it had to run immediately.
+        '''
+        now = pygame.time.get_ticks()
+        idle_fps = self.settings.video.idle_fps
+        timeout = int(1000 / idle_fps) if idle_fps else None
+        if self.next_wake is not None:
+            timeout = self.next_wake - now if timeout is None else min(timeout, self.next_wake - now)
+        self.next_wake = None
+        if timeout is not None and timeout <= 0:
+            return False
+        event = pygame.event.wait(timeout) if timeout is not None else pygame.event.wait()
+        if event.type != pygame.NOEVENT:
+            # Keep the event for the current screen and stay at the full rate while input arrives.
+            self.events.append(event)
+            self.keep_awake()
+        return True
+
+    def get_events(self):
+        '''
+        Returns the events received since the last frame, including the one that woke the scheduler.
+        Any event keeps the loop at the full frame rate for a while.
+        '''
+        if self.player is not None:
+            # Live events are dropped: the log alone drives a replay.
+            pygame.event.clear()
+            return self.player.events
+        events = pygame.event.get()
+        if self.events:
+            events = self.events + events
+            self.events = []
+        if events:
+            self.keep_awake()
+        if self.recorder is not None:
+            self.recorder.add_events(events)
+        return events
+
+    def mouse_state(self):
+        '''
+        Returns the input state of the current frame: the mouse position on the display, the mouse buttons
+        and the keyboard modifiers, taken from the log while replaying.
+        '''
+        if self.player is not None:
+            return self.player.mouse_pos, self.player.mouse_buttons, self.player.mods
+        state = (pygame.mouse.get_pos(), pygame.mouse.get_pressed(), pygame.key.get_mods())
+        if self.recorder is not None:
+            self.recorder.set_mouse(*state)
+        return state
+
+    def key_state(self):
+        '''
+        Returns the keyboard state of the current frame, indexed by key constant like pygame.key.get_pressed(),
+        taken from the log while replaying.
+        '''
+        if self.player is not None:
+            return self.player.keys
+        keys = pygame.key.get_pressed()
+        if self.recorder is not None:
+            self.recorder.set_keys(keys)
+        return keys
+
     def delta_time(self):
         '''
         Calculates the time since the last frame.
+        When the idle scheduler is enabled and nothing is happening, waits for events instead of spinning.
+
+        While replaying, frames run back to back with the recorded dt and time.
 
         Sets:
-        - dt: Delta time in seconds, based on the desired frames per second (fps) from the settings.
+        - dt: Delta time in seconds, based on the desired frames per second (fps) from the settings, by which the running animations are advanced.
         '''
-        self.dt = self.clock.tick(self.settings.video_settings['fps']) / 1000
+        if self.player is not None:
+            self.profiler.begin_frame()
+            self.dt = self.player.next_frame()
+            clock.freeze(self.player.ticks)
+            animator.step(self.dt)
+            self.profiler.mark('tick')
+            return
+        if self.settings.video.idle and self.is_idle() and self.wait_for_event():
+            # Time spent waiting is not animation time, so restart the clock.
+            self.clock.tick()
+        self.next_wake = None
+        # The frame starts once the scheduler stops waiting.
+        self.profiler.begin_frame()
+        self.dt = self.clock.tick(self.settings.video.fps) / 1000
+        if self.recorder is not None:
+            # Widgets see the same time for the whole frame, exactly as they will in the replay.
+            now = pygame.time.get_ticks()
+            clock.freeze(now)
+            self.recorder.begin_frame(now, self.dt)
+        # Advance every running animation once, before the canvas runs.
+        animator.step(self.dt)
+        self.profiler.mark('tick')
     
     def screen_update(self):
         '''
-        Updates the entire display window, rendering any changes.
+        Updates the display window, presenting only the regions queued by scale_screen.
+        With show_fps on, the frame statistics overlay is drawn on top and presented every frame.
+        '''
+        if self.settings.video.show_fps:
+            self.update_rects.append(self.overlay.draw(self.display_surf))
+        if self.full_update:
+            pygame.display.update()
+        elif self.update_rects:
+            pygame.display.update(self.update_rects)
+        # Give the canvas its pixels back before the next frame.
+        self.overlay.restore()
+        self.full_update = False
+        self.update_rects = []
+        self.profiler.mark('present')
+        self.profiler.end_frame()
+        if self.recorder is not None:
+            self.recorder.end_frame()
+
+class Layout():
+    '''
+    Converts logical coordinates, given on the Screen.WIDTH x Screen.HEIGHT reference canvas, to canvas pixels.
+    '''
+    def __init__(self, scale_x=1, scale_y=1):
+        '''
+        Initializes the Layout.
+
+        Parameters:
+        - scale_x: Horizontal scale from logical units to pixels. Default is 1;
+        - scale_y: Vertical scale from logical units to pixels. Default is 1.
+        '''
+        self.scale_x = scale_x
+        self.scale_y = scale_y
+        # Scale for lengths that must keep their proportions (font sizes, radii, borders).
+        self.scale = min(scale_x, scale_y)
+
+    def x(self, value):
+        '''
+        Converts a horizontal logical coordinate or distance to pixels.
+        '''
+        return value * self.scale_x
+
+    def y(self, value):
+        '''
+        Converts a vertical logical coordinate or distance to pixels.
+        '''
+        return value * self.scale_y
+
+    def pos(self, x, y):
+        '''
+        Converts a logical position to pixels.
+        '''
+        return (x * self.scale_x, y * self.scale_y)
+
+    def size(self, width, height):
+        '''
+        Converts a logical size to whole pixels.
+        '''
+        return (round(width * self.scale_x), round(height * self.scale_y))
+
+    def length(self, value):
+        '''
+        Converts a logical length (font size, border radius, border width) to whole pixels, never less than 1.
         '''
-        pygame.display.update()
+        return max(1, round(value * self.scale))
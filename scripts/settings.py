@@ -1,27 +1,267 @@
+import atexit
 import json
 import os
+import tempfile
+import threading
+import time
+import traceback
+import weakref
+from scripts.localization import available_languages
+
+class SettingsSection():
+    '''
+    Base for the typed settings sections.
+    Values are validated once, when loaded or changed, and stored in __slots__ attributes,
+    so reading them every frame is a plain attribute lookup instead of nested dictionary lookups.
+
+    Subclasses list their fields in FIELDS as (name, type, default) tuples and may check
+    individual values by overriding validate.
+    '''
+    __slots__ = ()
+    # Name of the section in settings.json.
+    SECTION = ''
+    FIELDS = ()
+
+    def __init__(self, values):
+        '''
+        Initializes the section from its JSON dictionary. Missing keys take their default value.
+
+        Parameters:
+        - values: The section dictionary.
+        '''
+        for name, kind, default in self.FIELDS:
+            setattr(self, name, self.check(name, kind, values.get(name, default)))
+
+    def check(self, name, kind, value):
+        '''
+        Checks the type of a value and validates it.
+
+        Parameters:
+        - name: The field name;
+        - kind: The expected type;
+        - value: The value to check.
+
+        Returns:
+        - The validated value. Raises ValueError if it is invalid.
+        '''
+        # Whole numbers are valid floats, but booleans, which are ints in Python, are not numbers here.
+        kinds = (int, float) if kind is float else kind
+        if not isinstance(value, kinds) or (kind is not bool and isinstance(value, bool)):
+            raise ValueError(f'{self.SECTION}.{name} must be {kind.__name__}, not {value!r}')
+        return self.validate(name, value)
+
+    def validate(self, name, value):
+        '''
+        Validates a single value. Subclasses raise ValueError for values out of range.
+        '''
+        return value
+
+    def values(self):
+        '''
+        Returns a dictionary with the value of every field.
+        '''
+        return {name: getattr(self, name) for name, _, _ in self.FIELDS}
+
+    def update(self, values):
+        '''
+        Validates and applies new values. Nothing is applied if any value is invalid.
+
+        Parameters:
+        - values: Dictionary with the keys to update and their new values.
+
+        Returns:
+        - A dictionary with the keys whose value actually changed and their validated values.
+        '''
+        fields = {name: kind for name, kind, _ in self.FIELDS}
+        changed = {}
+        for name, value in values.items():
+            if name not in fields:
+                raise KeyError(f'Unknown setting {self.SECTION}.{name}')
+            value = self.check(name, fields[name], value)
+            if getattr(self, name) != value:
+                changed[name] = value
+        for name, value in changed.items():
+            setattr(self, name, value)
+        return changed
+
+class VideoSettings(SettingsSection):
+    '''
+    Typed 'video' settings.
+    '''
+    __slots__ = ('width', 'height', 'render_mode', 'fps', 'idle', 'idle_fps', 'idle_delay', 'vsync', 'resizable', 'show_fps', 'disk_cache')
+    SECTION = 'video'
+    FIELDS = (
+        ('width', int, 1280),
+        ('height', int, 720),
+        ('render_mode', str, 'scaled'),
+        ('fps', int, 0),
+        ('idle', bool, True),
+        ('idle_fps', float, 2.0),
+        ('idle_delay', float, 0.5),
+        ('vsync', int, 0),
+        ('resizable', bool, False),
+        ('show_fps', bool, False),
+        ('disk_cache', bool, True)
+    )
+
+    def validate(self, name, value):
+        if name in ('width', 'height') and value <= 0:
+            raise ValueError(f'video.{name} must be positive, not {value!r}')
+        if name == 'render_mode' and value not in ('scaled', 'native'):
+            raise ValueError(f"video.render_mode must be 'scaled' or 'native', not {value!r}")
+        if name in ('fps', 'idle_fps', 'idle_delay') and value < 0:
+            raise ValueError(f'video.{name} must not be negative, not {value!r}')
+        if name == 'vsync' and value not in (0, 1):
+            raise ValueError(f'video.vsync must be 0 or 1, not {value!r}')
+        return value
+
+class AudioSettings(SettingsSection):
+    '''
+    Typed 'audio' settings.
+    '''
+    __slots__ = ('main_volume',)
+    SECTION = 'audio'
+    FIELDS = (
+        ('main_volume', int, 100),
+    )
+
+    def validate(self, name, value):
+        if not 0 <= value <= 100:
+            raise ValueError(f'audio.{name} must be between 0 and 100, not {value!r}')
+        return value
+
+class LanguageSettings(SettingsSection):
+    '''
+    Typed 'language' settings. The language set must be one of the locales in config/locales.
+    '''
+    __slots__ = ('languages', 'language_set')
+    SECTION = 'language'
+    FIELDS = (
+        ('language_set', str, 'en-US'),
+    )
+
+    def __init__(self, values):
+        # Locales with a catalog (only the file names are read).
+        self.languages = available_languages()
+        super().__init__(values)
+
+    def validate(self, name, value):
+        if value not in self.languages:
+            raise ValueError(f'language.language_set must be one of {self.languages}, not {value!r}')
+        return value
+
+class WriteBehind():
+    '''
+    Single background thread saving the pending changes of every Settings instance once they settle.
+    Instances are only referenced weakly, so a discarded Settings is freed even with a save pending.
+    '''
+    def __init__(self):
+        '''
+        Initializes the WriteBehind. The thread starts with the first scheduled save.
+        '''
+        self.condition = threading.Condition()
+        # Time each instance with pending changes is due to be saved, by instance.
+        self.deadlines = weakref.WeakKeyDictionary()
+        self.thread = None
+
+    def schedule(self, settings, delay):
+        '''
+        Saves a Settings instance after delay seconds, postponing the save already scheduled for it, if any.
+
+        Parameters:
+        - settings: The Settings instance;
+        - delay: Seconds to wait.
+        '''
+        with self.condition:
+            self.deadlines[settings] = time.monotonic() + delay
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='settings-write-behind', daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def run(self):
+        '''
+        Waits for the next deadline and saves the instances that are due, forever.
+        A save that fails is reported and keeps its changes pending, without stopping the thread.
+        '''
+        while True:
+            with self.condition:
+                now = time.monotonic()
+                due = [settings for settings, deadline in self.deadlines.items() if deadline <= now]
+                for settings in due:
+                    del self.deadlines[settings]
+                if not due:
+                    self.condition.wait(min(self.deadlines.values()) - now if self.deadlines else None)
+                    continue
+            for settings in due:
+                try:
+                    settings.flush()
+                except Exception:
+                    traceback.print_exc()
+            # Do not keep the last instance alive while waiting.
+            due = settings = None
+
+# Saves the changes of every Settings instance in write-behind mode.
+write_behind = WriteBehind()
+# Every live Settings instance, saved at exit.
+instances = weakref.WeakSet()
+
+def flush_all():
+    '''
+    Saves the pending changes of every live Settings instance.
+    '''
+    for settings in list(instances):
+        settings.flush()
+
+atexit.register(flush_all)
 
 class Settings():
     '''
     Manages game settings stored in a JSON file.
     Provides functionality to load, update, and retrieve settings.
+
+    The video, audio and language sections are also available as validated, typed objects
+    (video, audio and language). Objects interested in changes subscribe to a section and are
+    notified only of the keys whose value actually changed.
+
+    Changes are applied in memory right away. In write-behind mode they are written to the file
+    on a background thread once no change happened for flush_delay seconds, and at exit.
     '''
-    def __init__(self):
+    # Typed class of each section.
+    SECTIONS = {'video': VideoSettings, 'audio': AudioSettings, 'language': LanguageSettings}
+
+    def __init__(self, write_behind=True, flush_delay=1.0):
         '''
         Initializes the Settings class:
 
         - Defines the path to the settings JSON file;
         - Loads settings from the file into memory;
         - Initializes game-specific settings.
+
+        Parameters:
+        - write_behind: Whether changes are saved in the background instead of on every change. Default is True;
+        - flush_delay: Seconds without changes before they are saved in write-behind mode. Default is 1.0.
         '''
         # Define the base path of the project directory.
         self.path = os.path.join(os.path.dirname(__file__), '..')
         # Define the path to the settings.json file located in the 'config' directory.
         self.file_path = os.path.join(self.path, 'config', 'settings.json')
+        # Callbacks subscribed to each section.
+        self.subscribers = {}
         # Load the settings from the JSON file.
         self.settings = self.load_settings()
         # Initialize game-specific settings.
         self.game_settings()
+        self.write_behind = write_behind
+        self.flush_delay = flush_delay
+        # Sections changed in memory but not saved yet.
+        self.dirty = set()
+        # Lock protecting the settings dictionary between the game loop and the flush thread.
+        self.lock = threading.Lock()
+        # Lock serializing file writes, so an older snapshot never replaces a newer one.
+        self.write_lock = threading.Lock()
+        # Save whatever is still pending when the interpreter exits.
+        instances.add(self)
     
     def load_settings(self):
         '''
@@ -38,38 +278,159 @@ class Settings():
         Initializes game-related settings by extracting values from the loaded settings.
 
         Creates attributes for:
+        - Typed video, audio and language sections (video, audio, language);
         - Video settings;
         - Audio settings;
-        - Language settings;
-        - Game text based on the selected language;
+        - Language settings (the texts themselves are provided by scripts.localization);
         - Game data;
         - Controls.
+
+        The typed sections are validated here, raising ValueError if the file holds an invalid value.
         '''
+        # Build the typed sections (missing sections get their default values).
+        for option, section_class in self.SECTIONS.items():
+            values = self.settings.setdefault(option, {})
+            section = section_class(values)
+            setattr(self, option, section)
+            # Keep the dictionary in sync with the validated values.
+            values.update(section.values())
         # Load specific categories of settings.
-        # Video-related settings.
-        self.video_settings = self.get_settings('video')
-        # Audio-related settings.
-        self.audio_settings = self.get_settings('audio')
-        # Language settings.
-        self.language = self.get_settings('language')
-        # Get the current language set.
-        self.language_set = self.language['language_set']
-        # Load game texts corresponding to the selected language.
-        self.game_texts = self.language[self.language_set]
-        # Load other game-related settings.
-        self.game_data = self.get_settings('game_data')
-        self.controls = self.get_settings('keys')
+        for option in ('video', 'audio', 'language', 'game_data', 'keys'):
+            self.refresh_section(option)
+
+    def refresh_section(self, option):
+        '''
+        Updates the attributes derived from a single category of settings.
+
+        Parameters:
+        - option: The top-level category in the settings dictionary.
+        '''
+        if option == 'video':
+            # Video-related settings.
+            self.video_settings = self.get_settings('video')
+        elif option == 'audio':
+            # Audio-related settings.
+            self.audio_settings = self.get_settings('audio')
+        elif option == 'language':
+            # Get the current language set.
+            self.language_set = self.language.language_set
+        elif option == 'game_data':
+            # Load other game-related settings.
+            self.game_data = self.get_settings('game_data')
+        elif option == 'keys':
+            self.controls = self.get_settings('keys')
     
     def update_settings(self):
         '''
         Updates the JSON file with the current settings in memory.
-        Also reinitializes the game settings after updating the file.
+        Also reinitializes the game settings after updating the file and notifies the subscribers
+        of the typed sections of the keys whose value changed, like set_section_settings.
         '''
-        with open(self.file_path, 'w', encoding='utf-8') as file:
-            # Write the current settings dictionary to the file with indentation.
-            json.dump(self.settings, file, indent=4, ensure_ascii=False)
+        with self.lock:
+            self.dirty.update(self.settings)
+        self.flush()
+        # Values of the typed sections before they are rebuilt.
+        old_values = {option: getattr(self, option).values() for option in self.SECTIONS}
         # Reinitialize game settings to reflect the updated values.
         self.game_settings()
+        for option, values in old_values.items():
+            keys = {name for name, value in getattr(self, option).values().items() if value != values[name]}
+            if keys:
+                self.notify(option, keys)
+
+    def subscribe(self, option, callback):
+        '''
+        Registers a callback for changes to a category.
+
+        Parameters:
+        - option: The top-level category to watch;
+        - callback: Called as callback(option, keys), with the set of keys whose value changed.
+        '''
+        self.subscribers.setdefault(option, []).append(callback)
+
+    def unsubscribe(self, option, callback):
+        '''
+        Removes a callback registered with subscribe.
+        '''
+        callbacks = self.subscribers.get(option, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def changed(self, option, keys):
+        '''
+        Refreshes a category changed in memory, saves it, right away or in the background,
+        and notifies the subscribers.
+
+        Parameters:
+        - option: The top-level category that changed;
+        - keys: The keys whose value changed.
+        '''
+        # Only the changed category needs its derived attributes refreshed.
+        self.refresh_section(option)
+        with self.lock:
+            self.dirty.add(option)
+        if not self.write_behind:
+            self.flush()
+            self.notify(option, keys)
+            return
+        # Debounce: restart the countdown on every change, so a burst of changes ends in a single write.
+        write_behind.schedule(self, self.flush_delay)
+        self.notify(option, keys)
+
+    def notify(self, option, keys):
+        '''
+        Calls the callbacks subscribed to a category.
+
+        Parameters:
+        - option: The top-level category that changed;
+        - keys: The keys whose value changed.
+        '''
+        for callback in list(self.subscribers.get(option, ())):
+            callback(option, keys)
+
+    def flush(self):
+        '''
+        Writes the pending changes to the JSON file, if any.
+        The file is replaced atomically, so a crash mid-write never leaves it half written.
+        '''
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                dirty = set(self.dirty)
+                self.dirty.clear()
+                # Take a snapshot of the settings while no one is changing them.
+                data = json.dumps(self.settings, indent=4, ensure_ascii=False)
+            try:
+                self.write(data)
+            except BaseException:
+                # Keep the changes pending, so the next save (at the latest, at exit) writes them.
+                with self.lock:
+                    self.dirty.update(dirty)
+                raise
+
+    def write(self, data):
+        '''
+        Replaces the JSON file with the given content.
+
+        Parameters:
+        - data: The JSON text to write.
+        '''
+        directory = os.path.dirname(self.file_path)
+        # Write to a temporary file in the same directory, then swap it in.
+        handle, temp_path = tempfile.mkstemp(prefix='.settings-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            # Keep the permissions of the file being replaced.
+            if os.path.exists(self.file_path):
+                os.chmod(temp_path, os.stat(self.file_path).st_mode & 0o777)
+            os.replace(temp_path, self.file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
 
     def get_settings(self, key):
         '''
@@ -85,14 +446,34 @@ class Settings():
     
     def set_settings(self, option, key, value):
         '''
-        Updates a specific setting value and saves the changes to the JSON file.
+        Updates a specific setting value and saves the changes to the JSON file (see set_section_settings).
 
         Parameters:
         - option: The top-level category in the settings dictionary;
         - key: The specific key within the category to update;
         - value: The new value to set for the key.
         '''
-        # Update the value of the specified key in the settings dictionary.
-        self.settings[option][key] = value
-        # Save the updated settings to the JSON file.
-        self.update_settings()
+        self.set_section_settings(option, {key: value})
+
+    def set_section_settings(self, option, values):
+        '''
+        Updates several values of a category and saves the changes to the JSON file (see changed).
+        Values of typed sections are validated first, raising ValueError (or KeyError for unknown keys)
+        without changing anything.
+
+        Parameters:
+        - option: The top-level category in the settings dictionary;
+        - values: Dictionary with the keys to update and their new values.
+        '''
+        with self.lock:
+            if option in self.SECTIONS:
+                # Validate the values and keep only the ones that changed.
+                values = getattr(self, option).update(values)
+            else:
+                values = {key: value for key, value in values.items() if key not in self.settings[option] or self.settings[option][key] != value}
+            # Update the values in the settings dictionary.
+            self.settings[option].update(values)
+        # Nothing to save or notify if no value changed.
+        if values:
+            # Save the updated settings to the JSON file with a single write.
+            self.changed(option, set(values))
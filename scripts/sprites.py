@@ -1,29 +1,44 @@
-import pygame
 import os
+from scripts.assets import assets
 
 class Sprites:
-    def __init__(self, path):
+    def __init__(self, path=None):
         '''
         Initializes the Sprites class, setting up the directory for loading images.
 
         Parameters:
-        - path: The base directory path where the 'images' folder is located.
+        - path: The base directory path where the 'images' folder is located. Default is the project's assets directory.
         '''
         # Set the path to the 'images' directory by joining the base path with 'images'.
-        self.images_dir = os.path.join(path, 'images')
+        self.images_dir = os.path.join(path, 'images') if path else assets.directory
+        # Path of the loaded sprite, or None before load_sprite.
+        self.sprite_path = None
 
-    def load_sprite(self):
+    @property
+    def sprite(self):
+        '''
+        The loaded sprite, resolved through the AssetManager on each access, so it is always in the current display format.
+        '''
+        if self.sprite_path is None:
+            return None
+        return assets.image(self.sprite_path)
+
+    def load_sprite(self, name='sprite.png'):
         '''
         Loads a sprite image from the 'images' directory.
 
+        Parameters:
+        - name: The image file, relative to the 'images' directory. Default is 'sprite.png'.
+
         Functionality:
-        - Loads an image file named 'sprite.png' located in the 'images' folder;
-        - Uses `pygame.image.load` to load the image;
-        - Applies `convert_alpha()` to the loaded image to preserve transparency (useful for PNG images with alpha channels);
+        - Loads the image through the shared AssetManager, which packs small images into an atlas;
+        - The image is returned in the display format (convert_alpha() for images with transparency), converted once
+          and converted again automatically after the display changes. Only the path is kept, so draw with
+          the sprite attribute rather than holding on to the returned surface;
 
         Note:
-        - The method assumes that 'sprite.png' exists in the specified directory.
+        - The method assumes that the image exists in the specified directory.
         '''
-        # Load the image sprite.png from the images directory.
-        # The convert_alpha() method optimizes the image for transparency and faster blitting.
-        self.sprite = pygame.image.load(os.path.join(self.images_dir, 'sprite.png')).convert_alpha()
+        # An absolute path is used as is by the manager, whatever its images directory.
+        self.sprite_path = os.path.join(self.images_dir, name)
+        return self.sprite
@@ -0,0 +1,204 @@
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# Methods that can be sent twice with the same effect as once, so any failed attempt may be retried.
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'))
+
+class Transport():
+    '''
+    Shared HTTP transport for the authentication API.
+    Keeps one pooled keep-alive session per API host, applies timeouts, retries transient failures
+    with jittered exponential backoff and records the latency of every request.
+    '''
+    def __init__(self, timeout=(3.05, 10), retries=3, backoff=0.25, backoff_max=4, retry_statuses=(500, 502, 503, 504), pool_size=10, history=256):
+        '''
+        Initializes the Transport.
+
+        Parameters:
+        - timeout: Tuple (connect, read) in seconds applied to every attempt. Default is (3.05, 10);
+        - retries: Maximum number of retries after the first attempt. Default is 3;
+        - backoff: Base delay in seconds for the exponential backoff. Default is 0.25;
+        - backoff_max: Upper bound in seconds for a single backoff delay. Default is 4;
+        - retry_statuses: HTTP status codes considered transient. Default is (500, 502, 503, 504);
+        - pool_size: Maximum number of kept-alive connections per host. Default is 10;
+        - history: Number of latency samples kept for latency_stats. Default is 256.
+        '''
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retry_statuses = retry_statuses
+        self.pool_size = pool_size
+        # One session per (scheme, host), created on first use.
+        self.sessions = {}
+        # Lock protecting the sessions dict and the latency history.
+        self.lock = threading.Lock()
+        # Recent requests as (url, status_code, attempts, seconds); status_code is None on failure.
+        self.latencies = deque(maxlen=history)
+
+    def session(self, url):
+        '''
+        Returns the pooled session for the host of the given URL, creating it if needed.
+
+        Parameters:
+        - url: The request URL.
+        '''
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                # Retries are handled by request(), so the adapter itself never retries.
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.sessions[key] = session
+            return session
+
+    def post(self, url, **kwargs):
+        '''
+        Sends a POST request. See request for details.
+        '''
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        '''
+        Sends a request, retrying connection errors, timeouts and transient responses.
+        Non-idempotent requests (e.g. POST) are only retried after errors that happen before the request is sent
+        (see can_retry) and after a 503 with Retry-After (see is_transient): a sign-up the server may have processed
+        must not be sent again.
+
+        Parameters:
+        - method: The HTTP method;
+        - url: The request URL;
+        - kwargs: Extra arguments forwarded to requests.Session.request.
+
+        Returns:
+        - The last response received. Raises the last requests exception if no response was received.
+        '''
+        kwargs.setdefault('timeout', self.timeout)
+        session = self.session(url)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            delay = None
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if attempt > self.retries or not self.can_retry(method, error):
+                    self.record(url, None, attempt, time.perf_counter() - start)
+                    raise
+            else:
+                if attempt > self.retries or not self.is_transient(response, method):
+                    self.record(url, response.status_code, attempt, time.perf_counter() - start)
+                    return response
+                delay = self.retry_after(response)
+            # Wait before the next attempt, as long as the server asked for if it did.
+            time.sleep(self.backoff_delay(attempt) if delay is None else delay)
+
+    def can_retry(self, method, error) -> bool:
+        '''
+        Checks whether a failed attempt may be sent again.
+        Idempotent requests always may; others only if the connection could not be established,
+        since the server cannot have received them.
+
+        Parameters:
+        - method: The HTTP method;
+        - error: The requests exception raised by the attempt.
+        '''
+        if method.upper() in IDEMPOTENT_METHODS or isinstance(error, requests.ConnectTimeout):
+            return True
+        # Connection refused or unreachable host: requests wraps urllib3's NewConnectionError.
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def is_transient(self, response, method='GET') -> bool:
+        '''
+        Checks whether a response is worth retrying.
+        The API answers validation failures with a 5xx status and an error_code, which retrying cannot fix;
+        only bodies without an error_code, or with the generic '01' (Internal Server Error), are retried.
+        A response proves the server received the request, so for non-idempotent methods it is final,
+        except a 503 with Retry-After, by which the server states it did not process the request.
+
+        Parameters:
+        - response: The response to check;
+        - method: The HTTP method of the request. Default is 'GET'.
+        '''
+        if response.status_code not in self.retry_statuses:
+            return False
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return response.status_code == 503 and self.retry_after(response) is not None
+        try:
+            data = response.json()
+        except ValueError:
+            return True
+        return not isinstance(data, dict) or data.get('error_code') in (None, '01')
+
+    def retry_after(self, response):
+        '''
+        Returns the delay in seconds asked for by the Retry-After header of a response, capped at backoff_max,
+        or None if the header is missing or not a number of seconds.
+        '''
+        try:
+            return min(self.backoff_max, max(0.0, float(response.headers['Retry-After'])))
+        except (KeyError, ValueError):
+            return None
+
+    def backoff_delay(self, attempt):
+        '''
+        Returns the delay before the next attempt, using exponential backoff with full jitter.
+
+        Parameters:
+        - attempt: The number of the attempt that just failed (starting at 1).
+        '''
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (attempt - 1)))
+
+    def record(self, url, status_code, attempts, seconds):
+        '''
+        Stores the latency of a finished request.
+        '''
+        with self.lock:
+            self.latencies.append((url, status_code, attempts, seconds))
+
+    def latency_stats(self):
+        '''
+        Summarizes the recorded latencies.
+
+        Returns:
+        - A dictionary with count, mean, p50, p90, p99 and max latency in seconds and the total retries.
+        '''
+        with self.lock:
+            samples = list(self.latencies)
+        if not samples:
+            return {'count': 0, 'mean': 0, 'p50': 0, 'p90': 0, 'p99': 0, 'max': 0, 'retries': 0}
+        seconds = sorted(sample[3] for sample in samples)
+        count = len(seconds)
+        return {
+            'count': count,
+            'mean': sum(seconds) / count,
+            'p50': seconds[int(count * 0.5)],
+            'p90': seconds[min(count - 1, int(count * 0.9))],
+            'p99': seconds[min(count - 1, int(count * 0.99))],
+            'max': seconds[-1],
+            'retries': sum(sample[2] - 1 for sample in samples)
+        }
+
+    def close(self):
+        '''
+        Closes every pooled session.
+        '''
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+
+# Transport shared by every client of the authentication API.
+transport = Transport()
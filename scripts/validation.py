@@ -0,0 +1,30 @@
+# Characters a username may not contain.
+INVALID_USERNAME_CHARS = ' !@#$%^&*()/?:"<>|,.;'
+
+def check_sing_in(username, password):
+    '''
+    Validates a sign-in form before it is sent.
+
+    Returns:
+    - The catalog key of the error ('error_code07'), or None if the form can be sent.
+    '''
+    if username == '' or password == '':
+        return 'error_code07'
+    return None
+
+def check_sing_up(username, password, confirm_password):
+    '''
+    Validates a sign-up form before it is sent. The checks run in a fixed order and the first failing one is reported.
+
+    Returns:
+    - The catalog key of the error ('error_code02' to 'error_code05'), or None if the form can be sent.
+    '''
+    if confirm_password == '' or password == '' or username == '':
+        return 'error_code02'
+    if password != confirm_password:
+        return 'error_code03'
+    if any(char in username for char in INVALID_USERNAME_CHARS):
+        return 'error_code04'
+    if username[0] in '0123456789':
+        return 'error_code05'
+    return None
@@ -0,0 +1,69 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from scripts.transport import Transport
+
+class Handler(BaseHTTPRequestHandler):
+    '''
+    Answers every request with the status and headers set on the server, counting the requests.
+    '''
+    def respond(self):
+        '''
+        Counts the request and sends the configured response.
+        '''
+        self.server.hits += 1
+        body = b'{}'
+        self.send_response(self.server.status)
+        for name, value in self.server.headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = respond
+
+    def log_message(self, format, *args):
+        '''
+        Keeps the test output quiet.
+        '''
+
+class TransportRetryTest(unittest.TestCase):
+    '''
+    Checks which responses Transport.request retries.
+    '''
+    def setUp(self):
+        # Local server on a free port.
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.hits = 0
+        self.server.status = 500
+        self.server.headers = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        self.transport = Transport(retries=2, backoff=0, backoff_max=0)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_post_is_sent_once_on_server_error(self):
+        for status in (500, 502, 503, 504):
+            self.server.hits = 0
+            self.server.status = status
+            response = self.transport.post(self.url, json={})
+            self.assertEqual(response.status_code, status)
+            self.assertEqual(self.server.hits, 1)
+
+    def test_post_is_retried_on_503_with_retry_after(self):
+        self.server.status = 503
+        self.server.headers = {'Retry-After': '0'}
+        self.transport.post(self.url, json={})
+        self.assertEqual(self.server.hits, 3)
+
+    def test_get_is_retried_on_server_error(self):
+        self.transport.request('GET', self.url)
+        self.assertEqual(self.server.hits, 3)
+
+if __name__ == '__main__':
+    unittest.main()